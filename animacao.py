@@ -3,17 +3,74 @@
 Módulo de animação para o simulador de resgate
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-import numpy as np
-from typing import List, Dict, Tuple, Optional
-import time
+import importlib.util
+import io
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Tuple, Optional
+
+import matplotlib
+
+
+def _selecionar_backend():
+    """
+    Seleciona um backend interativo rasterizado pelo Agg (Qt5Agg ou TkAgg).
+
+    Respeita MPLBACKEND e mantém o padrão do matplotlib quando não há display.
+    """
+    if os.environ.get('MPLBACKEND'):
+        return
+    if sys.platform.startswith('linux') and not (
+        os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY')
+    ):
+        return
+    for backend, modulo in (('Qt5Agg', 'PyQt5'), ('TkAgg', 'tkinter')):
+        if importlib.util.find_spec(modulo) is None:
+            continue
+        try:
+            matplotlib.use(backend)
+            return
+        except ImportError:
+            continue
+
+
+_selecionar_backend()
+
+import numpy as np
 
 from structures.node import Node
 from structures.amostra_grafo import AmostraGrafo
+from structures.busca import custo_caminho_csr, dijkstra_bidirecional
+from structures.predio_grafo import SALA_ESCADA
 from config import NUM_ANDARES, SALAS_POR_ANDAR
 
+# Estilo das conexões por custo: (cor, alpha, largura, tipo de linha)
+ESTILOS_CONEXAO = {
+    1.0: ('green', 0.6, 1, '-'),
+    2.0: ('orange', 0.8, 2, '--'),  # Escada congestionada
+    5.0: ('red', 0.8, 2, ':'),  # Fumaça
+}
+ESTILO_CONEXAO_PADRAO = ('gray', 0.4, 1, '-')
+
+
+@lru_cache(maxsize=8)
+def _posicoes_para(n_andares: int, n_salas: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Posições 2D dos nós de um prédio, compartilhadas entre animadores (somente leitura)."""
+    pos_x = np.tile(np.arange(n_salas, dtype=np.float32), n_andares)
+    # Inverter para andar 1 ficar em baixo
+    pos_y = np.repeat(n_andares - np.arange(1, n_andares + 1, dtype=np.float32), n_salas)
+    pos_x.setflags(write=False)
+    pos_y.setflags(write=False)
+    return pos_x, pos_y
+
+
+def _escrever_arquivo(nome_arquivo: str, dados: bytes):
+    """Grava bytes já codificados em disco (executado na thread de salvamento)."""
+    with open(nome_arquivo, 'wb') as arquivo:
+        arquivo.write(dados)
+
 
 class AnimadorResgate:
     """Classe para animar a simulação de resgate."""
@@ -21,21 +78,37 @@ class AnimadorResgate:
     def __init__(self, amostra: AmostraGrafo, largura=18, altura=12):
         self.amostra = amostra
         
-        # Criar subplots - principal e legenda
-        self.fig = plt.figure(figsize=(largura, altura))
+        # pyplot só é carregado (fontes, backend) quando um animador é criado
+        import matplotlib.pyplot as plt
+        import matplotlib.animation as animation
+        self._plt = plt
+        self._animation = animation
+        
+        # Criar subplots - principal e legenda (layout ajustado pelo próprio draw)
+        self.fig = plt.figure(figsize=(largura, altura), layout='constrained')
         self.ax_main = plt.subplot2grid((4, 3), (0, 0), colspan=2, rowspan=4)
         self.ax_legend = plt.subplot2grid((4, 3), (0, 2), rowspan=2)
         self.ax_info = plt.subplot2grid((4, 3), (2, 2), rowspan=2)
         
-        self.positions = self._calcular_posicoes()
+        self.pos_x, self.pos_y = _posicoes_para(NUM_ANDARES, SALAS_POR_ANDAR)
+        self._andares = np.repeat(np.arange(1, NUM_ANDARES + 1), SALAS_POR_ANDAR)
+        self._salas = np.tile(np.arange(1, SALAS_POR_ANDAR + 1), NUM_ANDARES)
+        self._artistas_base = None  # artistas da estrutura base (ver _desenhar_base)
+        self._nodes = [Node(int(a), int(sala)) for a, sala in zip(self._andares, self._salas)]
+        
+        # Escrita de frames em disco fora da thread principal
+        self._pool_salvamento = ThreadPoolExecutor(max_workers=1)
+        self._salvamentos = []
+        self._bbox_salvamento = None  # área de salvamento, medida no primeiro frame
         self.caminho_atual = []
         self.passo_atual = 0
         
         # Configurar plot principal
-        plt.ion()  # Modo interativo
+        self._plt.ion()  # Modo interativo
         self._configurar_plot_principal()
         self._configurar_legenda()
         self._configurar_informacoes()
+        self._plt.show(block=False)  # janela aberta uma vez; depois só o canvas é bombeado
     
     def _configurar_plot_principal(self):
         """Configura o plot principal."""
@@ -71,11 +144,10 @@ class AnimadorResgate:
             ('━━', 'Caminho Percorrido')
         ]
         
-        y_pos = 0.9
-        for emoji, descricao in legenda_items:
-            self.ax_legend.text(0.05, y_pos, f'{emoji} {descricao}', 
+        # Posições em fração do eixo: o espaçamento acompanha o tamanho do painel
+        for i, (emoji, descricao) in enumerate(legenda_items):
+            self.ax_legend.text(0.05, 0.9 - 0.11 * i, f'{emoji} {descricao}', 
                               fontsize=10, va='center')
-            y_pos -= 0.11
     
     def _configurar_informacoes(self):
         """Configura o painel de informações."""
@@ -104,36 +176,50 @@ class AnimadorResgate:
             '• Encontrar melhor rota'
         ]
         
-        y_pos = 0.95
-        for regra in regras:
-            if regra.startswith('📏') or regra.startswith('⚠️') or regra.startswith('🎯'):
-                fontweight = 'bold'
-            else:
-                fontweight = 'normal'
-                
-            self.ax_info.text(0.05, y_pos, regra, fontsize=9, va='top', 
+        # Posições em fração do eixo, como na legenda; linhas vazias só
+        # ocupam espaço e não viram artistas
+        for i, regra in enumerate(regras):
+            if not regra:
+                continue
+            fontweight = 'bold' if regra.startswith(('📏', '⚠️', '🎯')) else 'normal'
+            self.ax_info.text(0.05, 0.95 - 0.055 * i, regra, fontsize=9, va='top', 
                             fontweight=fontweight)
-            y_pos -= 0.055
     
-    def _calcular_posicoes(self) -> Dict[Node, Tuple[float, float]]:
-        """Calcula posições 2D para os nós."""
-        positions = {}
-        for andar in range(1, NUM_ANDARES + 1):
-            for sala in range(1, SALAS_POR_ANDAR + 1):
-                node = Node(andar, sala)
-                x = sala - 1
-                y = NUM_ANDARES - andar  # Inverter para andar 1 ficar em baixo
-                positions[node] = (x, y)
-        return positions
+    @staticmethod
+    def _idx(node: Node) -> int:
+        """Índice do nó nos arrays de posição."""
+        return (node.andar - 1) * SALAS_POR_ANDAR + (node.sala - 1)
+    
+    def _posicao(self, node: Node) -> Tuple[float, float]:
+        """Posição (x, y) de um nó."""
+        i = self._idx(node)
+        return self.pos_x[i], self.pos_y[i]
+    
+    def _posicoes_caminho(self, caminho: List[Node]) -> Tuple[np.ndarray, np.ndarray]:
+        """Coordenadas x e y de todos os nós de um caminho."""
+        idx = np.fromiter((self._idx(n) for n in caminho), dtype=np.int32, count=len(caminho))
+        return self.pos_x[idx], self.pos_y[idx]
     
     def _desenhar_base(self):
-        """Desenha a estrutura base do prédio."""
+        """
+        Desenha a estrutura base do prédio.
+
+        Na primeira chamada tudo é desenhado; nas seguintes os artistas da
+        base ficam como estão e só o que foi acrescentado depois deles
+        (caminhos, textos, legenda) é removido, sem `ax.clear()` nem redesenho
+        da estrutura.
+        """
+        if self._artistas_base is not None:
+            self._remover_acrescimos()
+            return
+        
         self.ax_main.clear()
         self.ax_main.set_xlim(-1, SALAS_POR_ANDAR)
         self.ax_main.set_ylim(-1, NUM_ANDARES)
         self.ax_main.set_xlabel('Salas (1-12)', fontsize=12)
         self.ax_main.set_ylabel('Andares (1-7)', fontsize=12)
         self.ax_main.set_title('🔥 SIMULAÇÃO DE RESGATE EM PRÉDIO 🔥', fontsize=14, fontweight='bold')
+        
         self.ax_main.grid(True, alpha=0.3)
         
         # Adicionar labels dos andares
@@ -142,170 +228,241 @@ class AnimadorResgate:
             self.ax_main.text(-0.5, y, f'A{andar}', ha='center', va='center', 
                             fontweight='bold', fontsize=10)
         
-        # Desenhar salas com diferentes cores e símbolos
-        for node, (x, y) in self.positions.items():
-            # Determinar cor e símbolo baseado no tipo de sala
-            if node.andar == 1 and node.sala == 1:
-                # Entrada
-                self.ax_main.scatter(x, y, c='green', s=300, marker='s', 
-                                   edgecolors='black', linewidths=2, label='Entrada')
-                self.ax_main.text(x, y-0.3, '🚪', ha='center', va='center', fontsize=12)
-            elif node.andar == NUM_ANDARES and node.sala == SALAS_POR_ANDAR:
-                # Destino
-                self.ax_main.scatter(x, y, c='red', s=300, marker='*', 
-                                   edgecolors='black', linewidths=2, label='Destino')
-                self.ax_main.text(x, y-0.3, '🎯', ha='center', va='center', fontsize=12)
-            elif node.sala == 6:
-                # Escadas
-                self.ax_main.scatter(x, y, c='orange', s=250, marker='^', 
-                                   edgecolors='black', linewidths=1)
-                self.ax_main.text(x, y-0.3, '🪜', ha='center', va='center', fontsize=10)
-            elif node.sala % 2 == 0:
-                # Salas pares
-                self.ax_main.scatter(x, y, c='lightblue', s=200, alpha=0.8, 
-                                   edgecolors='navy', linewidths=1)
-            else:
-                # Salas ímpares
-                self.ax_main.scatter(x, y, c='lightgreen', s=200, alpha=0.8, 
-                                   edgecolors='darkgreen', linewidths=1)
-            
-            # Adicionar número da sala
-            self.ax_main.text(x, y, str(node.sala), ha='center', va='center', 
+        # Desenhar salas: um scatter por categoria em vez de um por sala
+        entrada = (self._andares == 1) & (self._salas == 1)
+        destino = (self._andares == NUM_ANDARES) & (self._salas == SALAS_POR_ANDAR)
+        comuns = ~(entrada | destino)
+        escadas = comuns & (self._salas == SALA_ESCADA)
+        pares = comuns & ~escadas & (self._salas % 2 == 0)
+        impares = comuns & ~escadas & (self._salas % 2 == 1)
+        
+        x, y = self.pos_x, self.pos_y
+        # Guardados para entrar explicitamente na legenda da comparação final
+        self._base_entrada = self.ax_main.scatter(x[entrada], y[entrada], c='green', s=300, marker='s', 
+                           edgecolors='black', linewidths=2, label='Entrada')
+        self._base_destino = self.ax_main.scatter(x[destino], y[destino], c='red', s=300, marker='*', 
+                           edgecolors='black', linewidths=2, label='Destino')
+        self.ax_main.scatter(x[escadas], y[escadas], c='orange', s=250, marker='^', 
+                           edgecolors='black', linewidths=1)
+        self.ax_main.scatter(x[pares], y[pares], c='lightblue', s=200, alpha=0.8, 
+                           edgecolors='navy', linewidths=1)
+        self.ax_main.scatter(x[impares], y[impares], c='lightgreen', s=200, alpha=0.8, 
+                           edgecolors='darkgreen', linewidths=1)
+        
+        # Ícones de entrada, destino e escadas
+        for mascara, icone, fontsize in ((entrada, '🚪', 12), (destino, '🎯', 12),
+                                         (escadas, '🪜', 10)):
+            for xi, yi in zip(x[mascara], y[mascara]):
+                self.ax_main.text(xi, yi-0.3, icone, ha='center', va='center', fontsize=fontsize)
+        
+        # Adicionar número da sala
+        for xi, yi, sala in zip(x, y, self._salas):
+            self.ax_main.text(xi, yi, str(sala), ha='center', va='center', 
                             fontsize=8, fontweight='bold')
         
         # Desenhar conexões com diferentes estilos baseados no tipo
         self._desenhar_conexoes()
+        self._artistas_base = set(self._artistas_main())
+    
+    def _artistas_main(self) -> list:
+        """Artistas de dados de `ax_main` (cópia: pode ser alterada ao remover)."""
+        ax = self.ax_main
+        return [*ax.collections, *ax.lines, *ax.texts, *ax.patches, *ax.images]
+    
+    def _remover_acrescimos(self):
+        """Remove de `ax_main` tudo o que não faz parte da estrutura base."""
+        for artista in self._artistas_main():
+            if artista not in self._artistas_base:
+                artista.remove()
+        legenda = self.ax_main.get_legend()
+        if legenda is not None:
+            legenda.remove()
     
     def _desenhar_conexoes(self):
         """Desenha as conexões entre salas com estilos diferentes."""
-        # Desenhar conexões
-        for node in self.amostra.adj:
-            x1, y1 = self.positions[node]
-            for vizinho, custo in self.amostra.adj[node]:
-                if vizinho in self.positions:
-                    x2, y2 = self.positions[vizinho]
-                    
-                    # Estilo da linha baseado no custo e tipo de conexão
-                    if custo == 1.0:
-                        cor_linha = 'green'
-                        alpha = 0.6
-                        linewidth = 1
-                        linestyle = '-'
-                    elif custo == 2.0:
-                        cor_linha = 'orange'  # Escada congestionada
-                        alpha = 0.8
-                        linewidth = 2
-                        linestyle = '--'
-                    elif custo == 5.0:
-                        cor_linha = 'red'  # Fumaça
-                        alpha = 0.8
-                        linewidth = 2
-                        linestyle = ':'
-                    else:
-                        cor_linha = 'gray'
-                        alpha = 0.4
-                        linewidth = 1
-                        linestyle = '-'
-                    
-                    # Desenhar apenas se não for muito próximo (evitar sobreposição)
-                    if abs(x1-x2) + abs(y1-y2) <= 2:  # Conexões próximas apenas
-                        self.ax_main.plot([x1, x2], [y1, y2], color=cor_linha, alpha=alpha, 
-                                        linewidth=linewidth, linestyle=linestyle)
+        from matplotlib.collections import LineCollection
+        
+        # Uma linha por aresta do CSR: porta e corredor entre as mesmas salas
+        # aparecem ambos, cada um com o estilo do próprio custo
+        origem, destino = self.amostra.origens, self.amostra.indices
+        custos = self.amostra.pesos
+        x1, y1 = self.pos_x[origem], self.pos_y[origem]
+        x2, y2 = self.pos_x[destino], self.pos_y[destino]
+        
+        # Desenhar apenas se não for muito próximo (evitar sobreposição)
+        proximas = np.abs(x1 - x2) + np.abs(y1 - y2) <= 2  # Conexões próximas apenas
+        segmentos = np.stack([np.column_stack([x1, y1]), np.column_stack([x2, y2])], axis=1)
+        
+        # Índice do estilo de cada conexão (o último é o estilo padrão)
+        estilos = list(ESTILOS_CONEXAO.values()) + [ESTILO_CONEXAO_PADRAO]
+        indice_estilo = np.select([custos == custo for custo in ESTILOS_CONEXAO],
+                                  range(len(ESTILOS_CONEXAO)), default=len(ESTILOS_CONEXAO))
+        
+        # Uma LineCollection por estilo
+        for k, (cor_linha, alpha, linewidth, linestyle) in enumerate(estilos):
+            segs = segmentos[proximas & (indice_estilo == k)]
+            if len(segs):
+                self.ax_main.add_collection(LineCollection(
+                    segs, colors=cor_linha, alpha=alpha,
+                    linewidths=linewidth, linestyles=linestyle))
     
     def animar_caminho(self, caminho: List[Node], titulo: str = "Simulação de Resgate", delay: float = 1.0):
         """Anima um caminho específico."""
-        self._desenhar_base()
-        
         if not caminho:
+            self._desenhar_base()
             self.ax_main.text(SALAS_POR_ANDAR/2, NUM_ANDARES/2, '❌ CAMINHO NÃO ENCONTRADO!', 
                             ha='center', va='center', fontsize=16, color='red', 
                             fontweight='bold', bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow"))
-            plt.tight_layout()
-            plt.pause(3)
+            self._aguardar(3)
+            return
+        
+        self._preparar_animacao(caminho, titulo)
+        
+        # Fundo (prédio + conexões) renderizado uma única vez
+        canvas = self.fig.canvas
+        canvas.draw()
+        fundo = canvas.copy_from_bbox(self.ax_main.bbox)
+        canvas.start_event_loop(delay)
+        
+        # Animar cada passo do caminho: só os artistas dinâmicos são redesenhados
+        for i in range(len(caminho)):
+            dinamicos = self._atualizar_passo(i)
+            canvas.restore_region(fundo)
+            for artista in dinamicos:
+                self.ax_main.draw_artist(artista)
+            canvas.blit(self.ax_main.bbox)
+            canvas.flush_events()
+            canvas.start_event_loop(delay)
+        
+        self._finalizar_animacao()
+        self._aguardar(delay * 2)
+    
+    def _aguardar(self, segundos: float):
+        """Redesenha o que mudou e processa eventos da janela por `segundos`.
+        
+        Equivale a `plt.pause`, mas fala direto com o canvas da figura em vez
+        de passar pelo gerenciador de figuras do pyplot.
+        """
+        self.fig.canvas.draw_idle()
+        self.fig.canvas.start_event_loop(segundos)
+    
+    def salvar_video(self, caminho: List[Node], nome_arquivo: str,
+                     titulo: str = "Simulação de Resgate", fps: int = 30):
+        """Exporta a animação de um caminho para MP4 (ffmpeg + libx264)."""
+        if not caminho:
+            print("❌ Nenhum caminho para exportar")
+            return
+        if not self._animation.FFMpegWriter.isAvailable():
+            print("⚠️ ffmpeg não encontrado; vídeo não gerado")
             return
         
+        self._preparar_animacao(caminho, titulo)
+        ani = self._animation.FuncAnimation(self.fig, self._atualizar_passo, frames=len(caminho),
+                                      init_func=self._iniciar_quadro, blit=True,
+                                      interval=1000 / fps, repeat=False)
+        ani.save(nome_arquivo, writer=self._animation.FFMpegWriter(fps=fps, codec='libx264', bitrate=2000))
+        self._finalizar_animacao()
+        print(f"🎞️ Vídeo salvo: {nome_arquivo}")
+    
+    def _preparar_animacao(self, caminho: List[Node], titulo: str):
+        """Desenha o fundo e cria os artistas dinâmicos de uma animação."""
+        self._desenhar_base()
+        self.caminho_atual = caminho
+        self.passo_atual = 0
+        self._caminho_x, self._caminho_y = self._posicoes_caminho(caminho)
+        
         # Adicionar informações de progresso
         self.ax_main.text(SALAS_POR_ANDAR/2, NUM_ANDARES + 0.5, 
                         f'🚨 {titulo} - {len(caminho)} passos', 
                         ha='center', va='center', fontsize=12, fontweight='bold',
                         bbox=dict(boxstyle="round,pad=0.3", facecolor="lightblue"))
         
-        plt.tight_layout()
-        plt.pause(delay)
-        
-        # Animar cada passo do caminho
-        for i, node in enumerate(caminho):
-            x, y = self.positions[node]
-            
-            # Destacar posição atual
-            self.ax_main.scatter(x, y, c='blue', s=400, marker='o', alpha=0.8, 
-                               edgecolors='navy', linewidths=3, zorder=10)
-            self.ax_main.text(x, y-0.5, '👤', ha='center', va='center', fontsize=16, zorder=11)
-            
-            # Desenhar rastro do caminho
-            if i > 0:
-                prev_node = caminho[i-1]
-                x_prev, y_prev = self.positions[prev_node]
-                self.ax_main.plot([x_prev, x], [y_prev, y], 'b-', linewidth=4, alpha=0.7, zorder=5)
-                
-                # Adicionar seta indicando direção
-                dx, dy = x - x_prev, y - y_prev
-                self.ax_main.annotate('', xy=(x, y), xytext=(x_prev, y_prev),
-                                    arrowprops=dict(arrowstyle='->', color='blue', lw=2))
-            
-            # Atualizar informações de progresso
-            progresso = f'Passo {i+1}/{len(caminho)} - Atual: {node}'
-            self.ax_main.text(SALAS_POR_ANDAR/2, -0.8, progresso, 
-                            ha='center', va='center', fontsize=10, 
-                            bbox=dict(boxstyle="round,pad=0.3", facecolor="lightgreen"))
-            
-            plt.tight_layout()
-            plt.pause(delay)
+        # Artistas dinâmicos: só eles são redesenhados a cada passo (blitting)
+        self._cursor = self.ax_main.scatter([], [], c='blue', s=400, marker='o', alpha=0.8, 
+                                            edgecolors='navy', linewidths=3, zorder=10,
+                                            animated=True)
+        # Marcador de caminho no lugar do emoji 👤: evita rasterizar glifo a cada quadro
+        self._cursor_icone, = self.ax_main.plot([], [], marker='P', markersize=12, color='navy',
+                                                markeredgecolor='white', linestyle='none',
+                                                zorder=11, animated=True)
+        self._rastro, = self.ax_main.plot([], [], 'b-', linewidth=4, alpha=0.7, zorder=5,
+                                          animated=True)
+        self._progresso_texto = self.ax_main.text(SALAS_POR_ANDAR/2, -0.8, '', 
+                                                  ha='center', va='center', fontsize=10, 
+                                                  bbox=dict(boxstyle="round,pad=0.3", facecolor="lightgreen"),
+                                                  animated=True)
+        self._dinamicos = (self._rastro, self._cursor,
+                           self._cursor_icone, self._progresso_texto)
+    
+    def _iniciar_quadro(self):
+        """Estado inicial dos artistas dinâmicos (init_func do FuncAnimation)."""
+        self._cursor.set_offsets(np.empty((0, 2)))
+        self._cursor_icone.set_data([], [])
+        self._rastro.set_data([], [])
+        self._progresso_texto.set_text('')
+        return self._dinamicos
+    
+    def _atualizar_passo(self, i: int):
+        """Atualiza os artistas dinâmicos para o passo `i` e os devolve."""
+        self.passo_atual = i
+        node = self.caminho_atual[i]
+        xs, ys = self._caminho_x, self._caminho_y
+        x, y = xs[i], ys[i]
+        
+        # Destacar posição atual; o rastro termina nela e já indica a direção
+        self._cursor.set_offsets([[x, y]])
+        self._cursor_icone.set_data([x], [y-0.5])
+        self._rastro.set_data(xs[:i+1], ys[:i+1])
+        
+        # Atualizar informações de progresso
+        self._progresso_texto.set_text(f'Passo {i+1}/{len(self.caminho_atual)} - Atual: {node}')
+        return self._dinamicos
+    
+    def _finalizar_animacao(self):
+        """Fixa o último quadro e marca a chegada ao destino."""
+        # A partir daqui o quadro volta a ser desenhado por completo
+        for artista in self._dinamicos:
+            artista.set_animated(False)
         
         # Marcar chegada ao destino
-        destino = caminho[-1]
-        x_dest, y_dest = self.positions[destino]
+        caminho = self.caminho_atual
+        x_dest, y_dest = self._caminho_x[-1], self._caminho_y[-1]
         self.ax_main.scatter(x_dest, y_dest, c='gold', s=500, marker='*', 
                            edgecolors='red', linewidths=3, zorder=12)
         self.ax_main.text(x_dest, y_dest-0.7, '🏁', ha='center', va='center', fontsize=20, zorder=13)
         
-        self.ax_main.text(SALAS_POR_ANDAR/2, -0.8, 
-                        f'✅ RESGATE CONCLUÍDO! Caminho: {len(caminho)} passos', 
-                        ha='center', va='center', fontsize=12, fontweight='bold',
-                        bbox=dict(boxstyle="round,pad=0.3", facecolor="lightgreen"))
-        
-        plt.tight_layout()
-        plt.pause(delay * 2)
+        self._progresso_texto.set_text(f'✅ RESGATE CONCLUÍDO! Caminho: {len(caminho)} passos')
+        self._progresso_texto.set_fontsize(12)
+        self._progresso_texto.set_fontweight('bold')
+    
+    def dijkstra(self, origem: Node, destino: Node) -> Tuple[float, Optional[List[Node]]]:
+        """Dijkstra (bidirecional) sobre a adjacência CSR da amostra. Retorna (custo, caminho)."""
+        amostra = self.amostra
+        custo, caminho = dijkstra_bidirecional(self._idx(origem), self._idx(destino),
+                                               *amostra.csr, amostra.csr_reverso)
+        if caminho is None:
+            return custo, None
+        return custo, [self._nodes[j] for j in caminho]
     
     def _calcular_custo_caminho(self, caminho: List[Node]) -> float:
-        """Calcula o custo total de um caminho."""
+        """Calcula o custo total de um caminho (inf se usar conexão inexistente)."""
         if len(caminho) <= 1:
             return 0.0
         
-        custo_total = 0.0
-        for i in range(len(caminho) - 1):
-            atual = caminho[i]
-            proximo = caminho[i + 1]
-            
-            # Buscar custo na adjacência
-            for vizinho, custo in self.amostra.adj.get(atual, []):
-                if vizinho == proximo:
-                    custo_total += custo
-                    break
-        
-        return custo_total
+        idx = np.fromiter((self._idx(n) for n in caminho), dtype=np.int32, count=len(caminho))
+        return float(custo_caminho_csr(idx, *self.amostra.csr))
     
     def animar_comparacao(self, caminho_bfs: List[Node], caminho_dijkstra: List[Node], delay: float = 1.0):
         """Anima uma comparação entre BFS e Dijkstra."""
         # Primeira animação: BFS
         if caminho_bfs:
             self.animar_caminho(caminho_bfs, "🔍 BFS - Busca em Largura", delay)
-            time.sleep(2)
+            self._aguardar(2)
         
         # Segunda animação: Dijkstra
         if caminho_dijkstra:
             self.animar_caminho(caminho_dijkstra, "⚡ Dijkstra - Menor Custo", delay)
-            time.sleep(2)
+            self._aguardar(2)
         
         # Comparação final
         self._desenhar_comparacao_final(caminho_bfs, caminho_dijkstra)
@@ -314,18 +471,19 @@ class AnimadorResgate:
         """Desenha comparação final entre os dois algoritmos."""
         self._desenhar_base()
         
+        # Itens da legenda, na ordem em que entram no desenho
+        itens_legenda = [self._base_entrada, self._base_destino]
+        
         if caminho_bfs:
             # Desenhar caminho BFS
-            x_bfs = [self.positions[node][0] for node in caminho_bfs]
-            y_bfs = [self.positions[node][1] for node in caminho_bfs]
-            self.ax_main.plot(x_bfs, y_bfs, 'g-', linewidth=4, alpha=0.8, 
+            x_bfs, y_bfs = self._posicoes_caminho(caminho_bfs)
+            itens_legenda += self.ax_main.plot(x_bfs, y_bfs, 'g-', linewidth=4, alpha=0.8, 
                             label=f'🔍 BFS ({len(caminho_bfs)} passos)')
         
         if caminho_dijkstra:
             # Desenhar caminho Dijkstra
-            x_dij = [self.positions[node][0] for node in caminho_dijkstra]
-            y_dij = [self.positions[node][1] for node in caminho_dijkstra]
-            self.ax_main.plot(x_dij, y_dij, 'purple', linewidth=4, alpha=0.8, linestyle='--', 
+            x_dij, y_dij = self._posicoes_caminho(caminho_dijkstra)
+            itens_legenda += self.ax_main.plot(x_dij, y_dij, 'purple', linewidth=4, alpha=0.8, linestyle='--', 
                             label=f'⚡ Dijkstra ({len(caminho_dijkstra)} passos)')
         
         # Marcar origem e destino
@@ -334,13 +492,13 @@ class AnimadorResgate:
             origem = caminho_ref[0]
             destino = caminho_ref[-1]
             
-            x_orig, y_orig = self.positions[origem]
-            x_dest, y_dest = self.positions[destino]
+            x_orig, y_orig = self._posicao(origem)
+            x_dest, y_dest = self._posicao(destino)
             
-            self.ax_main.scatter(x_orig, y_orig, c='blue', s=500, marker='s', 
-                               label='🚪 Entrada', edgecolors='black', linewidths=2)
-            self.ax_main.scatter(x_dest, y_dest, c='red', s=500, marker='*', 
-                               label='🎯 Destino', edgecolors='black', linewidths=2)
+            itens_legenda.append(self.ax_main.scatter(x_orig, y_orig, c='blue', s=500, marker='s', 
+                               label='🚪 Entrada', edgecolors='black', linewidths=2))
+            itens_legenda.append(self.ax_main.scatter(x_dest, y_dest, c='red', s=500, marker='*', 
+                               label='🎯 Destino', edgecolors='black', linewidths=2))
         
         # Adicionar estatísticas
         stats_text = ""
@@ -355,23 +513,44 @@ class AnimadorResgate:
                         ha='center', va='center', fontsize=11, 
                         bbox=dict(boxstyle="round,pad=0.5", facecolor="lightyellow"))
         
-        self.ax_main.legend(loc='upper right')
-        plt.tight_layout()
-        plt.pause(5)
+        self.ax_main.legend(handles=itens_legenda, loc='upper right')
+        self._aguardar(5)
     
-    def salvar_frame(self, nome_arquivo: str):
-        """Salva o frame atual."""
-        plt.savefig(nome_arquivo, dpi=150, bbox_inches='tight')
+    def salvar_frame(self, nome_arquivo: str, dpi: int = 100):
+        """
+        Salva o frame atual (a escrita em disco ocorre em segundo plano).
+        
+        100 dpi já cobre a tela; use 150 ou mais apenas para impressão. O PNG
+        é gravado com compressão zlib mínima, que domina o tempo de codificação.
+        """
+        # bbox 'tight' exigiria um desenho extra só para medir, a cada chamada
+        if self._bbox_salvamento is None:
+            renderer = self.fig.canvas.get_renderer()
+            self._bbox_salvamento = self.fig.get_tightbbox(renderer).padded(0.1)
+        buffer = io.BytesIO()
+        self.fig.savefig(buffer, format='png', dpi=dpi, bbox_inches=self._bbox_salvamento,
+                         pil_kwargs={'optimize': False, 'compress_level': 1})
+        self._salvamentos.append(
+            self._pool_salvamento.submit(_escrever_arquivo, nome_arquivo, buffer.getvalue()))
         print(f"💾 Frame salvo: {nome_arquivo}")
     
     def fechar(self):
-        """Fecha a animação."""
-        plt.ioff()
-        plt.close(self.fig)
+        """Fecha a animação, aguardando os frames ainda sendo gravados."""
+        self._pool_salvamento.shutdown(wait=True)
+        for salvamento in self._salvamentos:
+            salvamento.result()  # propaga erros de escrita
+        self._salvamentos.clear()
+        self._plt.ioff()
+        self._plt.close(self.fig)
 
 
 def demo_animacao():
-    """Demonstração da animação."""
+    """
+    Demonstração da animação.
+
+    Requer um backend interativo baseado em Agg: PyQt5 (Qt5Agg) ou tkinter
+    (TkAgg). Sem nenhum deles, o matplotlib usa o backend padrão.
+    """
     from structures.predio_grafo import PredioGrafo
     
     print("🎬 Iniciando demonstração da animação...")
@@ -391,14 +570,17 @@ def demo_animacao():
     
     try:
         # Importar algoritmos
-        from resgate_simulacao import bfs, dijkstra
+        from resgate_simulacao import bfs
         
         # Executar buscas
         print("🔍 Executando BFS...")
-        caminho_bfs = bfs(origem, destino, amostra.adj)
+        caminho_bfs = bfs(predio.node_id(origem), predio.node_id(destino),
+                          amostra.indptr, amostra.indices)
+        if caminho_bfs:
+            caminho_bfs = [predio.nodes[i] for i in caminho_bfs]
         
         print("⚡ Executando Dijkstra...")
-        custo_dij, caminho_dijkstra = dijkstra(origem, destino, amostra.adj)
+        custo_dij, caminho_dijkstra = animador.dijkstra(origem, destino)
         
         # Animar
         print("🎬 Iniciando animação...")
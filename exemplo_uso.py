@@ -3,10 +3,12 @@
 Exemplo de uso das estruturas modularizadas do simulador de resgate
 """
 
+import numpy as np
+
 from config import NUM_ANDARES, SALAS_POR_ANDAR, SEMENTE
 from structures.node import Node
 from structures.edge import Edge
-from structures.predio_grafo import PredioGrafo
+from structures.predio_grafo import PredioGrafo, TIPOS_ARESTA
 from structures.amostra_grafo import AmostraGrafo
 
 
@@ -28,7 +30,7 @@ def exemplo_basico():
     # 3. Criar estrutura base do prédio
     predio = PredioGrafo(3, 6)  # 3 andares, 6 salas por andar
     print(
-        f"Prédio criado com {len(predio.nodes)} nós e {len(predio.base_edges)} arestas"
+        f"Prédio criado com {len(predio.nodes)} nós e {predio.u_arr.size} arestas"
     )
 
     # 4. Criar amostra com incertezas
@@ -67,8 +69,8 @@ def comparar_configuracoes():
 
     for seed in seeds:
         amostra = AmostraGrafo(predio, seed=seed)
-        total_arestas = sum(len(vizinhos) for vizinhos in amostra.adj.values())
-        total_arestas_base = len(predio.base_edges)
+        total_arestas = int(amostra.indptr[-1])
+        total_arestas_base = predio.u_arr.size
 
         print(
             f"Semente {seed}: {total_arestas}/{total_arestas_base} arestas mantidas "
@@ -83,14 +85,12 @@ def estatisticas_estrutura():
     predio = PredioGrafo(NUM_ANDARES, SALAS_POR_ANDAR)
 
     # Contar tipos de arestas
-    tipos = {}
-    for edge in predio.base_edges:
-        tipos[edge.tipo] = tipos.get(edge.tipo, 0) + 1
+    contagens = np.bincount(predio.tipo_arr, minlength=len(TIPOS_ARESTA))
 
     print(f"Total de nós: {len(predio.nodes)}")
-    print(f"Total de arestas: {len(predio.base_edges)}")
+    print(f"Total de arestas: {predio.u_arr.size}")
     print("Distribuição por tipo:")
-    for tipo, count in tipos.items():
+    for tipo, count in zip(TIPOS_ARESTA, contagens.tolist()):
         print(f"  {tipo}: {count} arestas")
 
 
@@ -13,30 +13,43 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, Tuple, List, Optional
 import math
-import random
-from collections import deque, defaultdict
-import heapq
 
 # Mantém apenas um import de cada
 import matplotlib.pyplot as plt
 from matplotlib import animation
+from matplotlib.collections import LineCollection
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from config import NUM_ANDARES, SALAS_POR_ANDAR, SEMENTE
+from structures import amostra_grafo, predio_grafo
+from structures.busca import (
+    AreaBusca,
+    a_estrela as _a_estrela_ids,
+    bfs_csr,
+    custo_caminho,
+    custo_caminho_csr,
+    dijkstra_bidirecional,
+    dijkstra_bidirecional_csr,
+    transpor_csr_em,
+)
+from structures.jit import njit
 
 
 # --------------------------------------
 # Definições de classes e funções
 # --------------------------------------
 
-from dataclasses import dataclass
-from typing import Dict, List
-import math
-import random
-from collections import deque, defaultdict
-import heapq
-import matplotlib.pyplot as plt
-from matplotlib import animation
-
+# Modelo 0-based (andar e sala a partir de 0) com flags por aresta, usado
+# pelo percurso por todas as salas e pela animação detalhada. As buscas e a
+# simulação usam o pacote `structures` (ids inteiros e CSR).
 
-@dataclass
+@dataclass(slots=True)
 class Node:
     andar: int
     sala: int
@@ -53,7 +66,7 @@ class Node:
         return (self.andar, self.sala) < (other.andar, other.sala)
 
 
-@dataclass
+@dataclass(slots=True)
 class Edge:
     destino: Node
     tipo: str
@@ -68,7 +81,13 @@ class PredioGrafo:
     def __init__(self, andares=7, salas=12):
         self.andares = andares
         self.salas = salas
-        self.grafo: Dict[Node, List[Edge]] = defaultdict(list)
+        # Arestas de saída por id do nó (ver `_id_no`), com `nodes` paralelo
+        self.nodes: List[Node] = [Node(a, s) for a in range(andares) for s in range(salas)]
+        self.grafo: List[List[Edge]] = [[] for _ in self.nodes]
+        # Primeira aresta de cada par (id origem, id destino), para consulta O(1);
+        # na estrutura base nenhuma está bloqueada
+        self.arestas: Dict[Tuple[int, int], Edge] = {}
+        self.arestas_livres = self.arestas
         self._criar_grafo()
 
     def _criar_grafo(self):
@@ -110,152 +129,217 @@ class PredioGrafo:
     def _adicionar_conexao_bidirecional(self, node1: Node, node2: Node, tipo: str):
         """Adiciona conexão bidirecional entre dois nós"""
         custo_base = 1.0 if tipo != "escada" else 2.0
-        self.grafo[node1].append(Edge(node2, tipo, custo_base))
-        self.grafo[node2].append(Edge(node1, tipo, custo_base))
+        ida, volta = Edge(node2, tipo, custo_base), Edge(node1, tipo, custo_base)
+        id1, id2 = _id_no(self, node1), _id_no(self, node2)
+        self.grafo[id1].append(ida)
+        self.grafo[id2].append(volta)
+        self.arestas.setdefault((id1, id2), ida)
+        self.arestas.setdefault((id2, id1), volta)
 
     def vizinhos(self, node: Node):
-        return self.grafo[node]
+        return self.grafo[_id_no(self, node)]
 
 
 class AmostraGrafo:
-    def __init__(self, base: PredioGrafo):
+    def __init__(self, base: PredioGrafo, rng: Optional[np.random.Generator] = None):
         self.andares = base.andares
         self.salas = base.salas
-        self.grafo: Dict[Node, List[Edge]] = defaultdict(list)
-        self._amostrar(base)
-
-    def _amostrar(self, base: PredioGrafo):
+        self.nodes = base.nodes
+        self.grafo: List[List[Edge]] = [[] for _ in base.nodes]
+        # Primeira aresta (e primeira não bloqueada) de cada par de ids
+        self.arestas: Dict[Tuple[int, int], Edge] = {}
+        self.arestas_livres: Dict[Tuple[int, int], Edge] = {}
+        self._amostrar(base, rng if rng is not None else np.random.default_rng())
+
+    def _amostrar(self, base: PredioGrafo, rng: np.random.Generator):
         """
         Aplica incertezas estocásticas conforme especificação:
         - 15% de portas (pares/ímpares) bloqueadas
         - 30% de corredores com fumaça (custo passa a 5)
         - 20% de escadas congestionadas (custo dobra)
         """
-        for node, edges in base.grafo.items():
-            for edge in edges:
-                novo = Edge(edge.destino, edge.tipo, edge.custo)
-                
-                # Aplicar incertezas baseadas no tipo de conexão
-                if edge.tipo in ["porta_par", "porta_impar"]:
-                    # 15% de chance de porta estar bloqueada
-                    if random.random() < 0.15:
-                        novo.bloqueada = True
-                
-                elif edge.tipo == "corredor":
-                    # 30% de chance de ter fumaça (custo passa a 5)
-                    if random.random() < 0.30:
-                        novo.fumaca = True
-                        novo.custo = 5.0
-                
-                elif edge.tipo == "escada":
-                    # 20% de chance de congestionamento (dobra custo)
-                    if random.random() < 0.20:
-                        novo.escada_congestionada = True
-                        novo.custo = edge.custo * 2
-                
-                self.grafo[node].append(novo)
+        arestas = [(i, edge) for i, edges in enumerate(base.grafo) for edge in edges]
+        tipos = np.array([edge.tipo for _, edge in arestas])
+        # Um sorteio por aresta, todos de uma vez, aplicado conforme o tipo
+        sorteio = rng.random(len(arestas))
+        bloqueada = np.isin(tipos, ("porta_par", "porta_impar")) & (sorteio < 0.15)
+        fumaca = (tipos == "corredor") & (sorteio < 0.30)
+        congestionada = (tipos == "escada") & (sorteio < 0.20)
+
+        for (i, edge), b, f, c in zip(
+            arestas, bloqueada.tolist(), fumaca.tolist(), congestionada.tolist()
+        ):
+            # Fumaça: custo passa a 5; congestionamento: dobra o custo
+            custo = 5.0 if f else edge.custo * 2 if c else edge.custo
+            novo = Edge(edge.destino, edge.tipo, custo,
+                        bloqueada=b, fumaca=f, escada_congestionada=c)
+            self.grafo[i].append(novo)
+            par = (i, _id_no(self, edge.destino))
+            self.arestas.setdefault(par, novo)
+            if not novo.bloqueada:
+                self.arestas_livres.setdefault(par, novo)
 
     def vizinhos(self, node: Node):
-        return self.grafo[node]
-
-
-def bfs(origem: Node, destino: Node, adj: Dict[Node, List[Tuple[Node, float]]]) -> Optional[List[Node]]:
-    """Ignora custos; encontra qualquer caminho (se existir)."""
-    fila = deque([origem])
-    visitado = {origem: None}  # predecessor
-    while fila:
-        u = fila.popleft()
-        if u == destino:
-            # reconstrói caminho
-            caminho = []
-            x = u
-            while x is not None:
-                caminho.append(x)
-                x = visitado[x]
-            return list(reversed(caminho))
-        for v, _ in adj.get(u, []):
-            if v not in visitado:
-                visitado[v] = u
-                fila.append(v)
-    return None
-
-
-def dijkstra(origem: Node, destino: Node, adj: Dict[Node, List[Tuple[Node, float]]]) -> Tuple[float, Optional[List[Node]]]:
-    """Menor custo acumulado até destino. Retorna (custo, caminho)."""
-    dist: Dict[Node, float] = defaultdict(lambda: math.inf)
-    prev: Dict[Node, Optional[Node]] = {}
-    dist[origem] = 0.0
-    prev[origem] = None
-
-    # desempate estável usando id(node) no heap
-    heap = [(0.0, id(origem), origem)]
-    while heap:
-        d, _, u = heapq.heappop(heap)
-        if d > dist[u]:
-            continue
-        if u == destino:
-            # reconstrói caminho
-            caminho = []
-            x = u
-            while x is not None:
-                caminho.append(x)
-                x = prev[x]
-            return dist[u], list(reversed(caminho))
-        for v, w in adj.get(u, []):
-            nd = d + w
-            if nd < dist[v]:
-                dist[v] = nd
-                prev[v] = u
-                heapq.heappush(heap, (nd, id(v), v))
-
-    return math.inf, None
-    while heap:
-        custo, atual, caminho = heapq.heappop(heap)
-        if atual == fim:
-            return caminho, custo
-        if atual in visitados:
-            continue
-        visitados.add(atual)
-        for edge in grafo.vizinhos(atual):
-            if edge.bloqueada:
-                continue
-            novo_custo = custo + edge.custo
-            heapq.heappush(heap, (novo_custo, edge.destino, caminho + [edge.destino]))
-    return None, math.inf
+        return self.grafo[_id_no(self, node)]
 
 
-def encontrar_caminho_visitando_todas_salas(grafo, entrada: Node):
+def bfs(origem: int, destino: int, indptr, indices, trabalho: Optional[AreaBusca] = None) -> Optional[List[int]]:
     """
-    Encontra um caminho que visita todas as salas do prédio começando da entrada.
-    Retorna o caminho completo e o custo total.
+    Ignora custos; encontra qualquer caminho (se existir) sobre a adjacência CSR.
+    `trabalho` são buffers reaproveitados entre chamadas (ver `AreaBusca`).
     """
-    todas_salas = set()
-    for andar in range(grafo.andares):
-        for sala in range(grafo.salas):
-            todas_salas.add(Node(andar, sala))
-    
-    return dfs_visitar_todas(grafo, entrada, todas_salas, [entrada], set([entrada]))
+    if origem == destino:
+        return [origem]
+    if trabalho is None:
+        trabalho = AreaBusca.para_grafo(indptr)
+    k = bfs_csr(origem, destino, indptr, indices, trabalho.prev_f, trabalho.fila)
+    # O caminho sai do núcleo em `fila[:k]`, do destino para a origem
+    return trabalho.fila[k - 1::-1].tolist() if k else None
 
 
-def dfs_visitar_todas(grafo, atual: Node, restantes: set, caminho: list, visitados: set):
-    """DFS para visitar todas as salas"""
-    if not restantes:
-        return caminho, calcular_custo_caminho(grafo, caminho)
-    
-    for edge in grafo.vizinhos(atual):
-        if edge.bloqueada or edge.destino in visitados:
+def dijkstra(origem: int, destino: int, indptr, indices, pesos, reverso=None, trabalho: Optional[AreaBusca] = None) -> Tuple[float, Optional[List[int]]]:
+    """
+    Menor custo acumulado até destino sobre a adjacência CSR. Retorna (custo, caminho).
+
+    Usa Dijkstra bidirecional; `reverso` é a adjacência reversa da amostra
+    (`AmostraGrafo.csr_reverso`), calculada na hora se omitida.
+    """
+    if origem == destino:
+        return 0.0, [origem]
+    return dijkstra_bidirecional(origem, destino, indptr, indices, pesos, reverso, trabalho)
+
+
+def a_estrela(origem: int, destino: int, amostra: amostra_grafo.AmostraGrafo) -> Tuple[float, Optional[List[int]]]:
+    """
+    Menor custo até destino via A* sobre a amostra. Retorna (custo, caminho).
+
+    Heurística: mínimo de arestas até o destino (`PredioGrafo.saltos_minimos`)
+    vezes o menor peso da amostra, o que a mantém admissível e consistente.
+    """
+    if origem == destino:
+        return 0.0, [origem]
+    menor_peso = float(amostra.pesos.min()) if amostra.pesos.size else 0.0
+    h = amostra.base.saltos_minimos(destino) * menor_peso
+    return _a_estrela_ids(origem, destino, *amostra.csr, h)
+
+
+ESCADA_SALA = 5  # sala 6 em índice 0-based (grafo legado)
+
+
+def encontrar_caminho_visitando_todas_salas(grafo, entrada: Node):
+    """
+    Encontra um percurso que visita todas as salas do prédio começando da
+    entrada (no primeiro andar). Retorna o caminho completo e o custo total.
+
+    Os andares só se ligam pela escada (sala 6), então o percurso é resolvido
+    andar a andar: a ordem de visita sai do DP em bitmask de `_percurso_andar`
+    sobre os menores custos entre salas do andar, começando onde se chegou e
+    terminando na escada (no último andar, em qualquer sala). Salas podem ser
+    repassadas no trajeto entre duas visitas.
+    """
+    caminho = [entrada]
+    custo_total = 0.0
+    inicio = entrada.sala
+    ultimo = grafo.andares - 1
+    for andar in range(entrada.andar, grafo.andares):
+        custos, proximo = _custos_andar(grafo, andar)
+        if not np.isfinite(custos).all():
+            return None, math.inf  # andar desconexo
+        fim = ESCADA_SALA if andar < ultimo else -1
+        custo, ordem = _percurso_andar(custos, inicio, fim)
+        ordem = ordem.tolist()
+        if fim == inicio and len(ordem) > 1:
+            ordem.append(inicio)  # volta à escada para subir
+        for a, b in zip(ordem, ordem[1:]):
+            while a != b:
+                a = int(proximo[a, b])
+                caminho.append(Node(andar, a))
+        custo_total += custo
+
+        if andar < ultimo:
+            escada = grafo.arestas_livres.get(
+                (_id_no(grafo, Node(andar, ESCADA_SALA)), _id_no(grafo, Node(andar + 1, ESCADA_SALA)))
+            )
+            if escada is None:
+                return None, math.inf
+            caminho.append(Node(andar + 1, ESCADA_SALA))
+            custo_total += escada.custo
+            inicio = ESCADA_SALA
+
+    return caminho, custo_total
+
+
+def _custos_andar(grafo, andar: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Menor custo entre cada par de salas do andar, só por arestas livres do
+    próprio andar (Floyd-Warshall vetorizado), e o próximo passo de cada par.
+    """
+    m = grafo.salas
+    custos = np.full((m, m), np.inf)
+    np.fill_diagonal(custos, 0.0)
+    for sala in range(m):
+        for edge in grafo.vizinhos(Node(andar, sala)):
+            if not edge.bloqueada and edge.destino.andar == andar:
+                j = edge.destino.sala
+                custos[sala, j] = min(custos[sala, j], edge.custo)
+    proximo = np.broadcast_to(np.arange(m), (m, m)).copy()
+    for k in range(m):
+        via = custos[:, k:k + 1] + custos[k:k + 1, :]
+        melhora = via < custos
+        custos = np.where(melhora, via, custos)
+        proximo = np.where(melhora, proximo[:, k:k + 1], proximo)
+    return custos, proximo
+
+
+@njit(cache=True)
+def _percurso_andar(custos, inicio, fim):
+    """
+    DP em bitmask (Held-Karp) sobre as salas de um andar: `dp[mask, v]` é o
+    menor custo saindo de `inicio`, tendo visitado `mask` e parando em `v`.
+
+    `fim` fixa a última sala; -1 aceita qualquer uma e `fim == inicio` fecha o
+    ciclo (o custo inclui a volta). Devolve (custo, ordem das salas).
+    """
+    m = custos.shape[0]
+    todas = (1 << m) - 1
+    dp = np.full((1 << m, m), np.inf)
+    pai = np.full((1 << m, m), -1, dtype=np.int32)
+    dp[1 << inicio, inicio] = 0.0
+    for mask in range(1 << m):
+        if not (mask >> inicio) & 1:
             continue
-            
-        novo_caminho = caminho + [edge.destino]
-        novo_visitados = visitados | {edge.destino}
-        novas_restantes = restantes - {edge.destino}
-        
-        resultado = dfs_visitar_todas(grafo, edge.destino, novas_restantes, 
-                                     novo_caminho, novo_visitados)
-        if resultado[0]:  # Se encontrou solução
-            return resultado
-    
-    return None, math.inf
+        for v in range(m):
+            d = dp[mask, v]
+            if d == np.inf:
+                continue
+            for w in range(m):
+                if (mask >> w) & 1:
+                    continue
+                nd = d + custos[v, w]
+                if nd < dp[mask | (1 << w), w]:
+                    dp[mask | (1 << w), w] = nd
+                    pai[mask | (1 << w), w] = v
+
+    ultima = fim
+    custo = np.inf
+    if fim >= 0 and fim != inicio:
+        custo = dp[todas, fim]
+    else:
+        for v in range(m):
+            volta = custos[v, inicio] if fim == inicio and m > 1 else 0.0
+            if dp[todas, v] + volta < custo:
+                custo = dp[todas, v] + volta
+                ultima = v
+
+    ordem = np.empty(m, dtype=np.int32)
+    mask = todas
+    v = ultima
+    for i in range(m - 1, -1, -1):
+        ordem[i] = v
+        u = pai[mask, v]
+        mask ^= 1 << v
+        v = u
+    return custo, ordem
 
 
 def resgate_completo(grafo):
@@ -304,34 +388,33 @@ def resgate_completo(grafo):
         return None, math.inf
 
 
+def _id_no(grafo, node: Node) -> int:
+    """Id inteiro do nó (0-based) no grafo legado: andar * salas + sala."""
+    return node.andar * grafo.salas + node.sala
+
+
 def calcular_custo_caminho(grafo, caminho):
     """Calcula o custo total de um caminho"""
     if len(caminho) <= 1:
         return 0
     
     custo_total = 0
-    for i in range(len(caminho) - 1):
-        atual = caminho[i]
-        proximo = caminho[i + 1]
-        
-        # Encontra a aresta correspondente
-        for edge in grafo.vizinhos(atual):
-            if edge.destino == proximo and not edge.bloqueada:
-                custo_total += edge.custo
-                break
-        else:
+    for atual, proximo in zip(caminho, caminho[1:]):
+        # Aresta correspondente (não bloqueada), em O(1)
+        edge = grafo.arestas_livres.get((_id_no(grafo, atual), _id_no(grafo, proximo)))
+        if edge is None:
             return math.inf  # Caminho inválido
+        custo_total += edge.custo
     
     return custo_total
 
 
 def caminho_custo(grafo, caminho):
     custo = 0
-    for i in range(len(caminho) - 1):
-        for edge in grafo.vizinhos(caminho[i]):
-            if edge.destino == caminho[i + 1]:
-                custo += edge.custo
-                break
+    for atual, proximo in zip(caminho, caminho[1:]):
+        edge = grafo.arestas.get((_id_no(grafo, atual), _id_no(grafo, proximo)))
+        if edge is not None:
+            custo += edge.custo
     return custo
 
 
@@ -353,31 +436,246 @@ def resumo():
     )
 
 
-def simular(base, inicio, fim, algoritmo="dijkstra"):
-    amostra = AmostraGrafo(base)
-    if algoritmo == "bfs":
-        caminho = bfs(amostra, inicio, fim)
-        custo = caminho_custo(amostra, caminho) if caminho else math.inf
-    else:
-        caminho, custo = dijkstra(amostra, inicio, fim)
-    return amostra, caminho, custo
+@lru_cache(maxsize=8)
+def predio_em_cache(num_andares: int, salas_por_andar: int) -> predio_grafo.PredioGrafo:
+    """Prédio base compartilhado por geometria (não altere o objeto devolvido)."""
+    return predio_grafo.PredioGrafo(num_andares, salas_por_andar)
+
+
+@lru_cache(maxsize=1024)
+def amostra_em_cache(num_andares: int, salas_por_andar: int, seed: int) -> amostra_grafo.AmostraGrafo:
+    """
+    Amostra de incertezas memorizada por (geometria, semente).
+
+    A geometria faz parte da chave para que prédios diferentes não
+    compartilhem amostras; os arrays CSR devolvidos são somente leitura.
+    """
+    amostra = amostra_grafo.AmostraGrafo(predio_em_cache(num_andares, salas_por_andar), seed=seed)
+    for array in (amostra.indptr, amostra.indices, amostra.pesos, amostra.tipos):
+        array.setflags(write=False)
+    return amostra
+
+
+@lru_cache(maxsize=1024)
+def caminho_minimo_em_cache(
+    origem: int, destino: int, num_andares: int, salas_por_andar: int, seed: int
+) -> Tuple[float, Optional[Tuple[int, ...]]]:
+    """`dijkstra` sobre `amostra_em_cache(...)`, memorizado; o caminho vem como tupla."""
+    amostra = amostra_em_cache(num_andares, salas_por_andar, seed)
+    custo, caminho = dijkstra(
+        origem, destino, *amostra.csr, amostra.csr_reverso
+    )
+    return custo, tuple(caminho) if caminho else None
+
+
+# Prédio base de cada processo de simulação (ver _iniciar_processo)
+_BASE_PROCESSO = None
+# Buffers das buscas e da amostragem, alocados uma vez por processo e
+# reaproveitados entre réplicas
+_TRABALHO_PROCESSO: Optional[AreaBusca] = None
+_AREA_AMOSTRA_PROCESSO: Optional[amostra_grafo.AreaAmostra] = None
+# Blocos abertos pelo processo; a referência mantém o mapeamento vivo
+_MEMORIA_PROCESSO: List[shared_memory.SharedMemory] = []
+
+
+def _compartilhar_arrays(arrays) -> Tuple[List[shared_memory.SharedMemory], List[Tuple[str, Tuple[int, ...], str]]]:
+    """Copia cada array para um bloco de memória compartilhada; devolve (blocos, descritores)."""
+    blocos, descritores = [], []
+    for arr in arrays:
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        blocos.append(shm)
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+        descritores.append((shm.name, arr.shape, arr.dtype.str))
+    return blocos, descritores
+
+
+def _iniciar_processo(num_andares: int, salas_por_andar: int, descritores):
+    """Remonta o prédio base no processo sobre as arestas em memória compartilhada, sem cópia."""
+    global _BASE_PROCESSO, _TRABALHO_PROCESSO, _AREA_AMOSTRA_PROCESSO
+    arrays = []
+    for nome, forma, dtype in descritores:
+        shm = shared_memory.SharedMemory(name=nome)
+        _MEMORIA_PROCESSO.append(shm)
+        arr = np.ndarray(forma, dtype=dtype, buffer=shm.buf)
+        arr.setflags(write=False)
+        arrays.append(arr)
+    _BASE_PROCESSO = predio_grafo.PredioGrafo.a_partir_de_arrays(
+        num_andares, salas_por_andar, *arrays
+    )
+    _TRABALHO_PROCESSO = AreaBusca(len(_BASE_PROCESSO.nodes))
+    _AREA_AMOSTRA_PROCESSO = amostra_grafo.AreaAmostra(_BASE_PROCESSO)
+
+
+# Uma linha por réplica de `simular`; custos ausentes (sem caminho) são NaN
+RESULTADO_DTYPE = np.dtype([
+    ("bfs_ok", np.bool_),
+    ("custo_bfs", np.float64),
+    ("passos_bfs", np.int32),
+    ("dijkstra_ok", np.bool_),
+    ("custo_dijkstra", np.float64),
+    ("passos_dijkstra", np.int32),
+])
+
+
+@njit(cache=True)
+def _replicas_csr(
+    u_base, v_base, tipo_base, sorteios, limiares, custos, origem, destino,
+    indptr, indices, pesos, tipos, cursor, indptr_r, indices_r, pesos_r,
+    dist_f, dist_b, prev_f, prev_b, heap_f, heap_b, pos_f, pos_b, fila,
+    custo_bfs, passos_bfs, custo_dij, passos_dij,
+):
+    """
+    Lote de réplicas num só núcleo compilado: para cada linha de `sorteios`,
+    amostra o CSR, monta a adjacência reversa, roda Dijkstra bidirecional e
+    BFS e grava custo e passos de cada uma (NaN e 0 sem caminho). Os buffers
+    são os de `AreaAmostra` e `AreaBusca`, reaproveitados a cada linha.
+    """
+    for r in range(sorteios.shape[0]):
+        total = amostra_grafo._amostrar_csr(
+            u_base, v_base, tipo_base, sorteios[r], limiares, custos,
+            indptr, indices, pesos, tipos, cursor,
+        )
+        ind, pes = indices[:total], pesos[:total]
+        transpor_csr_em(indptr, ind, pes, indptr_r, indices_r, pesos_r, cursor)
+        melhor, encontro = dijkstra_bidirecional_csr(
+            origem, destino, indptr, ind, pes, indptr_r, indices_r[:total], pesos_r[:total],
+            dist_f, dist_b, prev_f, prev_b, heap_f, heap_b, pos_f, pos_b,
+        )
+        # Alcançabilidade não depende de pesos: sem caminho no Dijkstra, a BFS também falha
+        if encontro == -1:
+            custo_dij[r] = np.nan
+            passos_dij[r] = 0
+            custo_bfs[r] = np.nan
+            passos_bfs[r] = 0
+            continue
+        # Passos do caminho ótimo: as duas metades, sem reconstruí-lo
+        passos = 1
+        x = prev_f[encontro]
+        while x != -1:
+            passos += 1
+            x = prev_f[x]
+        x = prev_b[encontro]
+        while x != -1:
+            passos += 1
+            x = prev_b[x]
+        custo_dij[r] = melhor
+        passos_dij[r] = passos
+
+        k = bfs_csr(origem, destino, indptr, ind, prev_f, fila)
+        # O caminho sai em `fila[:k]` do destino para a origem
+        custo_bfs[r] = custo_caminho_csr(fila[:k][::-1], indptr, ind, pes)
+        passos_bfs[r] = k
+
+
+def _executar_lote(sementes: List[np.random.SeedSequence]) -> np.ndarray:
+    """
+    Um lote de réplicas: sorteia as incertezas de cada uma com fluxo próprio
+    (uma linha por réplica) e roda BFS e Dijkstra de todas em `_replicas_csr`.
+    """
+    base = _BASE_PROCESSO
+    area, t = _AREA_AMOSTRA_PROCESSO, _TRABALHO_PROCESSO
+    sorteios = np.empty((len(sementes), base.tipo_arr.size), dtype=np.float32)
+    for linha, semente in zip(sorteios, sementes):
+        np.random.Generator(np.random.PCG64(semente)).random(dtype=np.float32, out=linha)
+
+    resultado = np.empty(len(sementes), dtype=RESULTADO_DTYPE)
+    custo_bfs, custo_dij = np.empty(len(sementes)), np.empty(len(sementes))
+    passos_bfs = np.empty(len(sementes), dtype=np.int32)
+    passos_dij = np.empty(len(sementes), dtype=np.int32)
+    _replicas_csr(
+        base.u_arr, base.v_arr, base.tipo_arr, sorteios,
+        amostra_grafo._LIMIARES, amostra_grafo._CUSTOS, 0, len(base.nodes) - 1,
+        area.indptr, area.indices, area.pesos, area.tipos, area.cursor,
+        area.indptr_r, area.indices_r, area.pesos_r,
+        t.dist_f, t.dist_b, t.prev_f, t.prev_b, t.heap_f, t.heap_b, t.pos_f, t.pos_b, t.fila,
+        custo_bfs, passos_bfs, custo_dij, passos_dij,
+    )
+    resultado["bfs_ok"] = passos_bfs > 0
+    resultado["custo_bfs"] = custo_bfs
+    resultado["passos_bfs"] = passos_bfs
+    resultado["dijkstra_ok"] = passos_dij > 0
+    resultado["custo_dijkstra"] = custo_dij
+    resultado["passos_dijkstra"] = passos_dij
+    return resultado
+
+
+def simular(
+    n_execucoes: int = 50,
+    seed_inicial: Optional[int] = SEMENTE,
+    max_workers: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Roda `n_execucoes` réplicas independentes (entrada A1:S1 -> saída no último
+    andar) em paralelo, uma por núcleo.
+
+    Cada réplica recebe um filho de `SeedSequence(seed_inicial)`, o que garante
+    fluxos PCG64 independentes (em vez de `seed + i`) e resultados
+    reprodutíveis para a mesma semente, qualquer que seja o número de processos.
+
+    As arestas do prédio base vão para memória compartilhada: os processos
+    mapeiam as mesmas páginas em vez de receber uma cópia serializada.
+
+    Devolve um array estruturado (`RESULTADO_DTYPE`) com uma linha por réplica.
+    """
+    base = predio_em_cache(NUM_ANDARES, SALAS_POR_ANDAR)
+    sementes = np.random.SeedSequence(seed_inicial).spawn(n_execucoes)
+    processos = max_workers or os.cpu_count() or 1
+    blocos, descritores = _compartilhar_arrays((base.u_arr, base.v_arr, base.tipo_arr))
+    try:
+        with ProcessPoolExecutor(
+            max_workers=processos,
+            initializer=_iniciar_processo,
+            initargs=(base.num_andares, base.salas_por_andar, descritores),
+        ) as executor:
+            # Réplicas em lotes: uma ida e volta entre processos e uma chamada
+            # compilada por lote, não por réplica
+            lote = max(1, n_execucoes // (4 * processos))
+            lotes = [sementes[i:i + lote] for i in range(0, n_execucoes, lote)]
+            resultados = list(executor.map(_executar_lote, lotes))
+    finally:
+        for shm in blocos:
+            shm.close()
+            shm.unlink()
+    return np.concatenate(resultados) if resultados else np.empty(0, dtype=RESULTADO_DTYPE)
+
+
+def estatisticas(resultados: np.ndarray) -> Dict[str, float]:
+    """Resume as réplicas de `simular`, uma passada vetorizada por coluna."""
+    if resultados.size == 0:
+        return {"execucoes": 0}
+    return {
+        "execucoes": int(resultados.size),
+        "sucesso_bfs_%": float(resultados["bfs_ok"].mean() * 100),
+        "sucesso_dijkstra_%": float(resultados["dijkstra_ok"].mean() * 100),
+        "custo_medio_bfs": float(np.nanmean(resultados["custo_bfs"])),
+        "custo_medio_dijkstra": float(np.nanmean(resultados["custo_dijkstra"])),
+        "passos_medios_bfs": float(resultados["passos_bfs"][resultados["bfs_ok"]].mean()),
+        "passos_medios_dijkstra": float(resultados["passos_dijkstra"][resultados["dijkstra_ok"]].mean()),
+        "economia_media": float(np.nanmean(resultados["custo_bfs"] - resultados["custo_dijkstra"])),
+    }
+
+
+# Layout das salas conforme a planta (6 à esquerda, 6 à direita, corredor
+# central): linha `s` = (x, y) da sala de índice `s`
+_SALAS_PLANTA = np.arange(12)
+SALA_POS = np.column_stack((
+    np.where(_SALAS_PLANTA < 6, 0, 2),
+    np.where(_SALAS_PLANTA < 6, 5 - _SALAS_PLANTA, 11 - _SALAS_PLANTA),
+))
+SALA_POS.setflags(write=False)
 
 
 def animar_caminho_detalhado(base, amostra, caminho, inicio, fim, custo):
     fig, ax = plt.subplots(figsize=(8, 8))
     plt.title("Resgate em Prédio em Chamas - Andar 1 (Exemplo de Layout)", fontsize=15)
-    # Layout das salas conforme a planta (6 à esquerda, 6 à direita, corredor central)
-    sala_pos = {}
-    for s in range(12):
-        if s < 6:
-            x, y = 0, 5 - s
-        else:
-            x, y = 2, 11 - s
-        sala_pos[s] = (x, y)
-    # Desenha as salas
+    sala_pos = SALA_POS
+    # Desenha as salas: um único artista com os 12 marcadores
+    ax.plot(
+        sala_pos[:, 0], sala_pos[:, 1], "s", linestyle="none",
+        color="lightgrey", markersize=120, zorder=1,
+    )
     for s in range(12):
         x, y = sala_pos[s]
-        ax.plot(x, y, "s", color="lightgrey", markersize=120, zorder=1)
         ax.text(
             x,
             y,
@@ -390,8 +688,10 @@ def animar_caminho_detalhado(base, amostra, caminho, inicio, fim, custo):
             zorder=2,
         )
     # Desenha o corredor
-    for y in range(6):
-        ax.plot(1, y, "s", color="white", markersize=120, zorder=0, alpha=0.01)
+    ax.plot(
+        np.ones(6), np.arange(6), "s", linestyle="none",
+        color="white", markersize=120, zorder=0, alpha=0.01,
+    )
     ax.text(
         1,
         2.5,
@@ -403,8 +703,10 @@ def animar_caminho_detalhado(base, amostra, caminho, inicio, fim, custo):
         color="gray",
         zorder=0,
     )
-    # Desenha arestas
-    for node, edges in amostra.grafo.items():
+    # Desenha arestas: segmentos, cores e espessuras numa passada, depois uma
+    # única LineCollection em vez de uma linha por aresta
+    segmentos, cores, espessuras = [], [], []
+    for node, edges in zip(amostra.nodes, amostra.grafo):
         andar = node.andar
         sala = node.sala
         if andar != 0:
@@ -431,7 +733,12 @@ def animar_caminho_detalhado(base, amostra, caminho, inicio, fim, custo):
                 cor = "blue"
                 lw = 3
                 label = "Escada congestionada"
-            ax.plot([x1, x2], [y1, y2], color=cor, lw=lw, zorder=0)
+            segmentos.append(((x1, y1), (x2, y2)))
+            cores.append(cor)
+            espessuras.append(lw)
+    ax.add_collection(
+        LineCollection(segmentos, colors=cores, linewidths=espessuras, zorder=0)
+    )
     # Escada (sala 6)
     ax.plot(2, 0, marker=(3, 0, 0), color="black", markersize=40, zorder=3)
     ax.text(
@@ -456,12 +763,9 @@ def animar_caminho_detalhado(base, amostra, caminho, inicio, fim, custo):
         ha="left",
         bbox=dict(facecolor="white", alpha=0.7),
     )
-    # Caminho
-    caminho_coords = (
-        [(sala_pos[node.sala][0], sala_pos[node.sala][1]) for node in caminho]
-        if caminho
-        else []
-    )
+    # Caminho: coordenadas de cada passo, calculadas uma vez para todos os quadros
+    salas_caminho = np.fromiter((node.sala for node in caminho or ()), dtype=np.intp)
+    xs, ys = sala_pos[salas_caminho, 0], sala_pos[salas_caminho, 1]
     (caminho_plot,) = ax.plot(
         [], [], "o-", color="green", lw=6, markersize=18, zorder=4
     )
@@ -492,21 +796,23 @@ def animar_caminho_detalhado(base, amostra, caminho, inicio, fim, custo):
     if caminho:
         for i, node in enumerate(caminho):
             msg = f"Passo {i+1}: Sala {node.sala+1}"
-            if i > 0:
-                prev = caminho[i - 1]
-                for edge in amostra.vizinhos(prev):
-                    if edge.destino == node:
-                        eventos = []
-                        if edge.tipo == "porta" and edge.bloqueada:
-                            eventos.append("Porta bloqueada (15%)")
-                        if edge.tipo == "porta" and edge.fumaca:
-                            eventos.append("Fumaça no corredor (30%, custo 5)")
-                        if edge.tipo == "porta" and edge.fumaca_toxica:
-                            eventos.append("Fumaça tóxica (30%, custo dobrado)")
-                        if edge.tipo == "escada" and edge.escada_congestionada:
-                            eventos.append("Escada congestionada (20%, custo dobrado)")
-                        if eventos:
-                            msg += " | " + " | ".join(eventos)
+            edge = (
+                amostra.arestas.get((_id_no(amostra, caminho[i - 1]), _id_no(amostra, node)))
+                if i > 0
+                else None
+            )
+            if edge is not None:
+                eventos = []
+                if edge.tipo == "porta" and edge.bloqueada:
+                    eventos.append("Porta bloqueada (15%)")
+                if edge.tipo == "porta" and edge.fumaca:
+                    eventos.append("Fumaça no corredor (30%, custo 5)")
+                if edge.tipo == "porta" and edge.fumaca_toxica:
+                    eventos.append("Fumaça tóxica (30%, custo dobrado)")
+                if edge.tipo == "escada" and edge.escada_congestionada:
+                    eventos.append("Escada congestionada (20%, custo dobrado)")
+                if eventos:
+                    msg += " | " + " | ".join(eventos)
             passos.append(msg)
     else:
         passos = ["Nenhum caminho disponível!"]
@@ -515,7 +821,7 @@ def animar_caminho_detalhado(base, amostra, caminho, inicio, fim, custo):
         if not caminho:
             status.set_text(passos[0])
             return (caminho_plot,)
-        caminho_plot.set_data(*zip(*caminho_coords[: frame + 1]))
+        caminho_plot.set_data(xs[: frame + 1], ys[: frame + 1])
         status.set_text(passos[frame])
         return caminho_plot, status
 
@@ -545,7 +851,7 @@ if __name__ == "__main__":
     
     # Importar visualização estática
     try:
-        from visualizacao import VisualizadorPredio
+        from visualizacao import VisualizadorPredio, salvar_figura
         VISUALIZACAO_DISPONIVEL = True
         print("✅ Visualização gráfica disponível!")
     except ImportError as e:
@@ -557,12 +863,12 @@ if __name__ == "__main__":
     print(f"Total de salas: {NUM_ANDARES * SALAS_POR_ANDAR}")
     
     # Criar estruturas
-    base = PredioGrafo(NUM_ANDARES, SALAS_POR_ANDAR)
-    amostra = AmostraGrafo(base, seed=42)
+    base = predio_grafo.PredioGrafo(NUM_ANDARES, SALAS_POR_ANDAR)
+    amostra = amostra_grafo.AmostraGrafo(base, seed=42)
     
     # Definir cenário de resgate
-    origem = Node(1, 1)  # Entrada do prédio
-    destino = Node(NUM_ANDARES, SALAS_POR_ANDAR)  # Sala 12 do último andar
+    origem = base.nodes[0]  # Entrada do prédio (A1:S1)
+    destino = base.nodes[-1]  # Sala 12 do último andar
     
     print(f"\n🎯 Cenário de Resgate:")
     print(f"Origem: {origem} (entrada do prédio)")
@@ -571,16 +877,21 @@ if __name__ == "__main__":
     # Visualizações estáticas
     if VISUALIZACAO_DISPONIVEL:
         print("\n🎨 Gerando visualizações estáticas...")
-        vis = VisualizadorPredio()
+        vis = VisualizadorPredio(base)
         
         # Estrutura base
-        fig1 = vis.visualizar_estrutura_base(base)
-        fig1.savefig('estrutura_base.png', dpi=300, bbox_inches='tight')
-        print("💾 Salvo: estrutura_base.png")
+        fig1 = vis.desenhar_estrutura_base()
+        gravacao1 = salvar_figura(fig1, 'estrutura_base.png')
         
-        # Amostra com incertezas
+        # Amostra com incertezas (desenhada enquanto a primeira é gravada)
         fig2 = vis.visualizar_amostra(amostra)
-        fig2.savefig('amostra_incertezas.png', dpi=300, bbox_inches='tight')
+        gravacao2 = salvar_figura(fig2, 'amostra_incertezas.png')
+        # Os pixels já foram copiados: a figura (a mesma nas duas vistas) pode
+        # ser fechada antes do fim da gravação, e não reaparece no plt.show()
+        plt.close(fig2)
+        gravacao1.result()
+        print("💾 Salvo: estrutura_base.png")
+        gravacao2.result()
         print("💾 Salvo: amostra_incertezas.png")
     
     # Executar algoritmos de busca
@@ -588,17 +899,22 @@ if __name__ == "__main__":
     
     # BFS
     print("🔍 BFS - Busca em Largura...")
-    caminho_bfs = bfs(origem, destino, amostra.adj)
+    id_origem, id_destino = base.node_id(origem), base.node_id(destino)
+    caminho_bfs = bfs(id_origem, id_destino, amostra.indptr, amostra.indices)
     if caminho_bfs:
-        custo_bfs = caminho_custo(caminho_bfs, amostra.adj)
+        custo_bfs = custo_caminho(caminho_bfs, *amostra.csr)
+        caminho_bfs = [base.nodes[i] for i in caminho_bfs]
         print(f"✅ BFS encontrou caminho: {len(caminho_bfs)} passos, custo {custo_bfs:.1f}")
     else:
         print("❌ BFS não encontrou caminho")
     
     # Dijkstra
     print("⚡ Dijkstra - Menor Custo...")
-    custo_dijkstra, caminho_dijkstra = dijkstra(origem, destino, amostra.adj)
+    custo_dijkstra, caminho_dijkstra = dijkstra(
+        id_origem, id_destino, *amostra.csr, amostra.csr_reverso,
+    )
     if caminho_dijkstra:
+        caminho_dijkstra = [base.nodes[i] for i in caminho_dijkstra]
         print(f"✅ Dijkstra encontrou caminho: {len(caminho_dijkstra)} passos, custo {custo_dijkstra:.1f}")
     else:
         print("❌ Dijkstra não encontrou caminho")
@@ -642,10 +958,10 @@ if __name__ == "__main__":
     # Simulações estatísticas
     print(f"\n📈 Executando simulações estatísticas...")
     resultados = simular(n_execucoes=50)
-    estatisticas = resumo(resultados)
+    resumo_resultados = estatisticas(resultados)
     
     print("\n📊 Resultados Estatísticos:")
-    for chave, valor in estatisticas.items():
+    for chave, valor in resumo_resultados.items():
         if isinstance(valor, float):
             print(f"{chave}: {valor:.2f}")
         else:
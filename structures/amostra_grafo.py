@@ -3,11 +3,14 @@
 Módulo contendo a classe AmostraGrafo que aplica incertezas estocásticas
 """
 
-from typing import Dict, Tuple, List, Optional
-import random
 from collections import defaultdict
+from functools import cached_property
+from typing import Dict, Tuple, List, Optional
+import numpy as np
 from .node import Node
-from .predio_grafo import PredioGrafo
+from .busca import transpor_csr
+from .jit import njit
+from .predio_grafo import PredioGrafo, PORTA_PAR, PORTA_IMPAR, CORREDOR, ESCADA
 
 # Importa configurações
 import sys
@@ -23,6 +26,90 @@ from config import (
     SEMENTE,
 )
 
+# Custos possíveis de uma aresta; inteiros pequenos ({1, 2, 5} no padrão)
+# cabem em uint8, com 1/8 da banda de float64 nas buscas
+_CUSTOS_POSSIVEIS = (CUSTO_LIVRE, CUSTO_FUMACA, CUSTO_LIVRE * 2)
+DTYPE_PESO = (
+    np.uint8
+    if all(float(c).is_integer() and 0 <= c <= 255 for c in _CUSTOS_POSSIVEIS)
+    else np.float64
+)
+
+# Argumentos fixos de `_amostrar_csr`; limiares em float32, como os sorteios
+_LIMIARES = np.array(
+    [P_PORTA_BLOQUEADA, P_CORREDOR_FUMACA, P_ESCADA_CONGESTIONADA], dtype=np.float32
+)
+_CUSTOS = np.array([CUSTO_LIVRE, CUSTO_FUMACA, CUSTO_LIVRE * 2], dtype=DTYPE_PESO)
+
+
+@njit(cache=True)
+def _amostrar_csr(
+    u_base, v_base, tipo_base, sorteio, limiares, custos,
+    indptr, indices, pesos, tipos, cursor,
+):
+    """
+    Aplica as incertezas e monta o CSR numa só varredura por etapa, sem
+    máscaras nem ordenação intermediárias, direto nos buffers de saída
+    (`indptr` com n + 1 posições; `indices`, `pesos` e `tipos` com espaço
+    para todas as arestas da base; `cursor` com n).
+
+    `limiares` = (porta bloqueada, fumaça, escada congestionada), no dtype
+    de `sorteio`; `custos` = (livre, fumaça, escada congestionada), no dtype
+    dos pesos. Devolve o número de arestas mantidas.
+
+    Os ids de `u_base`/`v_base` não são conferidos aqui (sem checagem de
+    limites no código compilado): `PredioGrafo` os valida ao ser criado.
+    """
+    n = indptr.size - 1
+    p_porta, p_fumaca, p_escada = limiares[0], limiares[1], limiares[2]
+    # 1ª passada: grau de saída das arestas mantidas (portas bloqueadas saem)
+    indptr[:] = 0
+    for k in range(u_base.size):
+        t = tipo_base[k]
+        if (t == PORTA_PAR or t == PORTA_IMPAR) and sorteio[k] < p_porta:
+            continue
+        indptr[u_base[k] + 1] += 1
+    for u in range(n):
+        indptr[u + 1] += indptr[u]
+
+    # 2ª passada: escreve cada aresta na faixa da origem, na ordem de construção
+    cursor[:] = indptr[:n]
+    for k in range(u_base.size):
+        t = tipo_base[k]
+        r = sorteio[k]
+        if (t == PORTA_PAR or t == PORTA_IMPAR) and r < p_porta:
+            continue
+        # Custo escolhido por índice (0 livre, 1 fumaça, 2 congestionada),
+        # sem desvio dependente do sorteio
+        c = (t == CORREDOR) * (r < p_fumaca) + 2 * ((t == ESCADA) * (r < p_escada))
+        i = cursor[u_base[k]]
+        indices[i] = v_base[k]
+        pesos[i] = custos[c]
+        tipos[i] = t
+        cursor[u_base[k]] = i + 1
+    return indptr[n]
+
+
+class AreaAmostra:
+    """
+    Buffers da amostragem de um prédio base, reaproveitados entre amostras
+    (ex.: as réplicas de `simular`): nenhuma alocação por amostra. Cada
+    `AmostraGrafo` criada com a mesma área sobrescreve os arrays da anterior.
+    Os buffers `*_r` recebem a adjacência reversa (`busca.transpor_csr_em`).
+    """
+
+    def __init__(self, base: PredioGrafo):
+        n, m = len(base.nodes), base.tipo_arr.size
+        self.sorteio = np.empty(m, dtype=np.float32)
+        self.indptr = np.empty(n + 1, dtype=np.int32)
+        self.indices = np.empty(m, dtype=np.int32)
+        self.pesos = np.empty(m, dtype=DTYPE_PESO)
+        self.tipos = np.empty(m, dtype=np.uint8)
+        self.cursor = np.empty(n, dtype=np.int32)
+        self.indptr_r = np.empty(n + 1, dtype=np.int32)
+        self.indices_r = np.empty(m, dtype=np.int32)
+        self.pesos_r = np.empty(m, dtype=DTYPE_PESO)
+
 
 class AmostraGrafo:
     """
@@ -30,37 +117,75 @@ class AmostraGrafo:
     - remove portas bloqueadas
     - ajusta custo do corredor conforme fumaça
     - ajusta custo da escada conforme congestionamento
+
+    As arestas mantidas ficam em formato CSR sobre os ids de nó da base:
+    os vizinhos de `u` são `indices[indptr[u]:indptr[u + 1]]`, com custos
+    em `pesos` (`DTYPE_PESO`) e códigos de tipo (`TIPOS_ARESTA`) em `tipos` na mesma faixa.
+
+    Os sorteios saem de `rng` (um `np.random.Generator`) quando informado;
+    senão, de um gerador PCG64 próprio criado a partir de `seed`. Com `area`,
+    os arrays são fatias dos buffers dela, válidas até a próxima amostra
+    sobre a mesma área.
     """
 
-    def __init__(self, base: PredioGrafo, *, seed: Optional[int] = SEMENTE):
+    def __init__(
+        self,
+        base: PredioGrafo,
+        *,
+        seed: Optional[int] = SEMENTE,
+        rng: Optional[np.random.Generator] = None,
+        area: Optional[AreaAmostra] = None,
+    ):
         self.base = base
-        self.adj: Dict[Node, List[Tuple[Node, float]]] = defaultdict(list)
         # controle de semente por execução
-        if seed is not None:
-            random.seed(seed)
-        self._amostrar_arestas()
-
-    def _amostrar_arestas(self):
-        for e in self.base.base_edges:
-            # Decide o destino da aresta conforme tipo e incerteza
-            if e.tipo in ("porta_par", "porta_impar"):
-                # 15% de chance de ficar indisponível (aresta removida)
-                if random.random() < P_PORTA_BLOQUEADA:
-                    continue  # remove
-                custo = CUSTO_LIVRE  # portas sem fumaça; custo fixo se existir
-            elif e.tipo == "corredor":
-                # 30% chance de fumaça, custo 5; senão custo 1
-                custo = (
-                    CUSTO_FUMACA if random.random() < P_CORREDOR_FUMACA else CUSTO_LIVRE
-                )
-            elif e.tipo == "escada":
-                # 20% chance de congestionamento, dobra custo
-                custo = (
-                    CUSTO_LIVRE * 2
-                    if random.random() < P_ESCADA_CONGESTIONADA
-                    else CUSTO_LIVRE
-                )
-            else:
-                custo = e.custo
-
-            self.adj[e.u].append((e.v, float(custo)))
+        if rng is None:
+            rng = np.random.Generator(np.random.PCG64(seed))
+        self._amostrar_arestas(rng, area if area is not None else AreaAmostra(base))
+
+    def _amostrar_arestas(self, rng: np.random.Generator, area: AreaAmostra):
+        base = self.base
+        # Um sorteio por aresta, usado conforme o tipo
+        rng.random(dtype=np.float32, out=area.sorteio)
+
+        # Portas: 15% bloqueadas (aresta removida); corredor: 30% com fumaça
+        # (custo 5); escada: 20% congestionada (dobra custo)
+        total = _amostrar_csr(
+            base.u_arr, base.v_arr, base.tipo_arr, area.sorteio, _LIMIARES, _CUSTOS,
+            area.indptr, area.indices, area.pesos, area.tipos, area.cursor,
+        )
+        self.indptr = area.indptr
+        self.indices = area.indices[:total]
+        self.pesos = area.pesos[:total]
+        self.tipos = area.tipos[:total]
+
+    @property
+    def csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Adjacência `(indptr, indices, pesos)`, na ordem esperada pelas buscas."""
+        return self.indptr, self.indices, self.pesos
+
+    @cached_property
+    def origens(self) -> np.ndarray:
+        """Origem de cada aresta do CSR (par de `indices`), para uso vetorizado."""
+        return np.repeat(
+            np.arange(self.indptr.size - 1, dtype=np.int32), np.diff(self.indptr)
+        )
+
+    @cached_property
+    def csr_reverso(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Adjacência reversa `(indptr, indices, pesos)`, para buscas a partir do destino."""
+        return transpor_csr(self.indptr, self.indices, self.pesos)
+
+    @cached_property
+    def adj(self) -> Dict[Node, List[Tuple[Node, float]]]:
+        """Adjacência como dicionário de `Node`, montada a partir do CSR."""
+        nodes = self.base.nodes
+        adj: Dict[Node, List[Tuple[Node, float]]] = defaultdict(list)
+        for u in range(len(nodes)):
+            inicio, fim = self.indptr[u], self.indptr[u + 1]
+            if inicio == fim:
+                continue
+            adj[nodes[u]] = [
+                (nodes[v], float(w))
+                for v, w in zip(self.indices[inicio:fim], self.pesos[inicio:fim])
+            ]
+        return adj
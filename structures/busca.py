@@ -0,0 +1,422 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com as buscas (BFS, Dijkstra e A*) sobre a adjacência CSR da amostra
+
+Os núcleos recebem ids inteiros de nó e os arrays `indptr`, `indices` e
+`pesos` de `AmostraGrafo`; são compilados com Numba quando disponível.
+"""
+
+from typing import List, Optional, Tuple
+import numpy as np
+from .jit import njit
+
+
+class AreaBusca:
+    """
+    Buffers de trabalho das buscas, alocados uma vez e reaproveitados entre
+    chamadas (ex.: as réplicas de `simular`). Comporta grafos de até `n` nós;
+    os núcleos usam só o prefixo que o grafo ocupa.
+    """
+
+    def __init__(self, n: int):
+        self.fila = np.empty(n, dtype=np.int32)
+        self.dist_f = np.empty(n)
+        self.dist_b = np.empty(n)
+        self.prev_f = np.empty(n, dtype=np.int32)
+        self.prev_b = np.empty(n, dtype=np.int32)
+        # Heaps indexados (4-ários): cada nó ocupa no máximo uma posição
+        self.heap_f = np.empty(n, dtype=np.int32)
+        self.heap_b = np.empty(n, dtype=np.int32)
+        self.pos_f = np.empty(n, dtype=np.int32)
+        self.pos_b = np.empty(n, dtype=np.int32)
+
+    @classmethod
+    def para_grafo(cls, indptr) -> "AreaBusca":
+        """Área do tamanho exato de um grafo CSR."""
+        return cls(indptr.size - 1)
+
+
+@njit(cache=True)
+def bfs_csr(origem, destino, indptr, indices, prev, fila):
+    """
+    BFS sobre a adjacência CSR usando os buffers `prev` e `fila`.
+
+    Devolve o número de nós do caminho encontrado (0 se não há caminho); o
+    caminho fica em `fila[:k]`, do destino para a origem.
+    """
+    n = indptr.size - 1
+    # `prev` também marca os visitados (-1 = não visto); a origem aponta para
+    # si mesma durante a busca e volta a -1 no fim, como espera a reconstrução
+    prev[:n] = -1
+    fila[0] = origem
+    if origem == destino:
+        return 1
+    # Fila circular: cada nó entra no máximo uma vez
+    inicio, fim = 0, 1
+    prev[origem] = origem
+    alcancou = False
+    while inicio < fim and not alcancou:
+        u = fila[inicio]
+        inicio += 1
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            if prev[v] == -1:
+                prev[v] = u
+                # Teste de objetivo na descoberta: poupa o resto da camada
+                if v == destino:
+                    alcancou = True
+                    break
+                fila[fim] = v
+                fim += 1
+    prev[origem] = -1
+    if not alcancou:
+        return 0
+
+    # A fila não é mais necessária: recebe o caminho, seguindo `prev`
+    k = 0
+    x = destino
+    while x != -1:
+        fila[k] = x
+        k += 1
+        x = prev[x]
+    return k
+
+
+# Heap 4-ário: metade da altura do binário e os quatro filhos lado a lado
+# na memória, o que barateia a descida que domina as remoções
+_ARIDADE = 4
+
+
+@njit(cache=True)
+def _heap_subir(heap, pos, chave, i):
+    """Sobe `heap[i]` até a ordem por `chave` ser restabelecida."""
+    v = heap[i]
+    while i > 0:
+        pai = (i - 1) // _ARIDADE
+        p = heap[pai]
+        if chave[p] <= chave[v]:
+            break
+        heap[i] = p
+        pos[p] = i
+        i = pai
+    heap[i] = v
+    pos[v] = i
+
+
+@njit(cache=True)
+def _heap_descer(heap, pos, chave, tamanho, i):
+    """Desce `heap[i]` até a ordem por `chave` ser restabelecida."""
+    v = heap[i]
+    while True:
+        primeiro = _ARIDADE * i + 1
+        if primeiro >= tamanho:
+            break
+        menor = primeiro
+        for filho in range(primeiro + 1, min(primeiro + _ARIDADE, tamanho)):
+            if chave[heap[filho]] < chave[heap[menor]]:
+                menor = filho
+        if chave[heap[menor]] >= chave[v]:
+            break
+        heap[i] = heap[menor]
+        pos[heap[i]] = i
+        i = menor
+    heap[i] = v
+    pos[v] = i
+
+
+@njit(cache=True)
+def _heap_inserir_ou_diminuir(heap, pos, chave, tamanho, v):
+    """
+    Heap indexado de nós ordenado por `chave[v]` (`pos[v]` = posição, -1 fora).
+    Insere `v` ou, se já está no heap, o reposiciona após `chave[v]` diminuir;
+    devolve o novo tamanho.
+    """
+    if pos[v] == -1:
+        heap[tamanho] = v
+        _heap_subir(heap, pos, chave, tamanho)
+        return tamanho + 1
+    _heap_subir(heap, pos, chave, pos[v])
+    return tamanho
+
+
+@njit(cache=True)
+def _heap_remover(heap, pos, chave, tamanho):
+    """Remove o nó de menor chave; devolve (nó, novo tamanho)."""
+    v = heap[0]
+    pos[v] = -1
+    tamanho -= 1
+    if tamanho > 0:
+        heap[0] = heap[tamanho]
+        _heap_descer(heap, pos, chave, tamanho, 0)
+    return v, tamanho
+
+
+@njit(cache=True)
+def dijkstra_csr(origem, destino, indptr, indices, pesos):
+    """Dijkstra sobre a adjacência CSR; devolve (distâncias, predecessores)."""
+    n = indptr.size - 1
+    dist = np.full(n, np.inf)
+    prev = np.full(n, -1, dtype=np.int32)
+    dist[origem] = 0.0
+    if origem == destino:
+        return dist, prev
+
+    # Heap indexado (4-ário) com decrease-key: sem entradas obsoletas para descartar
+    heap = np.empty(n, dtype=np.int32)
+    pos = np.full(n, -1, dtype=np.int32)
+    tamanho = _heap_inserir_ou_diminuir(heap, pos, dist, 0, origem)
+    # O destino nunca entra no heap: basta parar quando o topo não o melhora
+    while tamanho > 0 and dist[heap[0]] < dist[destino]:
+        u, tamanho = _heap_remover(heap, pos, dist, tamanho)
+        d = dist[u]
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            nd = d + pesos[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                prev[v] = u
+                if v != destino:
+                    tamanho = _heap_inserir_ou_diminuir(heap, pos, dist, tamanho, v)
+    return dist, prev
+
+
+@njit(cache=True)
+def dijkstra_bidirecional_csr(
+    origem, destino, indptr, indices, pesos, indptr_r, indices_r, pesos_r,
+    dist_f, dist_b, prev_f, prev_b, heap_f, heap_b, pos_f, pos_b,
+):
+    """
+    Dijkstra bidirecional: busca da origem na adjacência CSR e do destino na
+    adjacência reversa (`*_r`), sempre avançando a fronteira de menor topo.
+    Distâncias, predecessores e heaps indexados vêm prontos (ver `AreaBusca`).
+
+    Devolve (custo, nó de encontro); encontro é -1 se não há caminho. Os
+    predecessores da ida ficam em `prev_f` e os sucessores da volta em `prev_b`.
+    """
+    n = indptr.size - 1
+    dist_f[:n] = np.inf
+    dist_b[:n] = np.inf
+    prev_f[:n] = -1
+    prev_b[:n] = -1
+    pos_f[:n] = -1
+    pos_b[:n] = -1
+    dist_f[origem] = 0.0
+    dist_b[destino] = 0.0
+    melhor = np.inf
+    encontro = -1
+    if origem == destino:
+        return 0.0, origem
+
+    tam_f = _heap_inserir_ou_diminuir(heap_f, pos_f, dist_f, 0, origem)
+    tam_b = _heap_inserir_ou_diminuir(heap_b, pos_b, dist_b, 0, destino)
+    while tam_f > 0 and tam_b > 0:
+        topo_f = dist_f[heap_f[0]]
+        topo_b = dist_b[heap_b[0]]
+        # Nenhum caminho ainda não visto pode ser mais curto que o melhor achado
+        if topo_f + topo_b >= melhor:
+            break
+        if topo_f <= topo_b:
+            u, tam_f = _heap_remover(heap_f, pos_f, dist_f, tam_f)
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                nd = topo_f + pesos[k]
+                if nd < dist_f[v]:
+                    dist_f[v] = nd
+                    prev_f[v] = u
+                    tam_f = _heap_inserir_ou_diminuir(heap_f, pos_f, dist_f, tam_f, v)
+                if dist_f[v] + dist_b[v] < melhor:
+                    melhor = dist_f[v] + dist_b[v]
+                    encontro = v
+        else:
+            u, tam_b = _heap_remover(heap_b, pos_b, dist_b, tam_b)
+            for k in range(indptr_r[u], indptr_r[u + 1]):
+                v = indices_r[k]
+                nd = topo_b + pesos_r[k]
+                if nd < dist_b[v]:
+                    dist_b[v] = nd
+                    prev_b[v] = u
+                    tam_b = _heap_inserir_ou_diminuir(heap_b, pos_b, dist_b, tam_b, v)
+                if dist_f[v] + dist_b[v] < melhor:
+                    melhor = dist_f[v] + dist_b[v]
+                    encontro = v
+    return melhor, encontro
+
+
+@njit(cache=True)
+def a_estrela_csr(origem, destino, indptr, indices, pesos, h):
+    """
+    A* sobre a adjacência CSR com heurística consistente `h` (estimativa por
+    nó do custo até o destino); devolve (distâncias, predecessores).
+    """
+    n = indptr.size - 1
+    dist = np.full(n, np.inf)
+    prev = np.full(n, -1, dtype=np.int32)
+    dist[origem] = 0.0
+    if origem == destino:
+        return dist, prev
+
+    # Heap indexado pela estimativa total f = g + h
+    f = np.full(n, np.inf)
+    f[origem] = h[origem]
+    heap = np.empty(n, dtype=np.int32)
+    pos = np.full(n, -1, dtype=np.int32)
+    tamanho = _heap_inserir_ou_diminuir(heap, pos, f, 0, origem)
+    while tamanho > 0:
+        u, tamanho = _heap_remover(heap, pos, f, tamanho)
+        if u == destino:
+            break
+        d = dist[u]
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            nd = d + pesos[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                prev[v] = u
+                f[v] = nd + h[v]
+                tamanho = _heap_inserir_ou_diminuir(heap, pos, f, tamanho, v)
+    return dist, prev
+
+
+def a_estrela(
+    origem: int, destino: int, indptr, indices, pesos, h
+) -> Tuple[float, Optional[List[int]]]:
+    """Menor custo entre um par de nós via A* com heurística `h`. Retorna (custo, caminho de ids)."""
+    dist, prev = a_estrela_csr(
+        origem, destino, indptr, indices, pesos, np.asarray(h, dtype=np.float64)
+    )
+    if not np.isfinite(dist[destino]):
+        return float("inf"), None
+    return float(dist[destino]), reconstruir_caminho(prev, destino)
+
+
+@njit(cache=True)
+def transpor_csr_em(indptr, indices, pesos, indptr_r, indices_r, pesos_r, cursor):
+    """
+    Escreve a adjacência reversa (arestas v->u) nos buffers `*_r`, por
+    contagem: dentro de cada faixa, as arestas mantêm a ordem de origem.
+    `indptr_r` e `cursor` têm n + 1 e n posições; `indices_r` e `pesos_r`,
+    espaço para as arestas.
+    """
+    n = indptr.size - 1
+    indptr_r[:] = 0
+    for k in range(indptr[n]):
+        indptr_r[indices[k] + 1] += 1
+    for v in range(n):
+        indptr_r[v + 1] += indptr_r[v]
+    cursor[:] = indptr_r[:n]
+    for u in range(n):
+        for k in range(indptr[u], indptr[u + 1]):
+            i = cursor[indices[k]]
+            indices_r[i] = u
+            pesos_r[i] = pesos[k]
+            cursor[indices[k]] = i + 1
+
+
+def transpor_csr(indptr, indices, pesos):
+    """Adjacência reversa (arestas v->u) no mesmo formato CSR."""
+    n = indptr.size - 1
+    indptr_r = np.empty(n + 1, dtype=np.int32)
+    indices_r = np.empty(indices.size, dtype=np.int32)
+    pesos_r = np.empty(pesos.size, dtype=pesos.dtype)
+    transpor_csr_em(
+        indptr, indices, pesos, indptr_r, indices_r, pesos_r,
+        np.empty(n, dtype=np.int32),
+    )
+    return indptr_r, indices_r, pesos_r
+
+
+def dijkstra_bidirecional(
+    origem: int, destino: int, indptr, indices, pesos, reverso=None, trabalho=None
+) -> Tuple[float, Optional[List[int]]]:
+    """
+    Menor custo entre um par de nós via Dijkstra bidirecional.
+
+    `reverso` é a adjacência reversa `(indptr, indices, pesos)`; se omitida,
+    é calculada com `transpor_csr`. `trabalho` é uma `AreaBusca` reaproveitada
+    entre chamadas; se omitida, uma nova é alocada. Retorna (custo, caminho de ids).
+    """
+    if reverso is None:
+        reverso = transpor_csr(indptr, indices, pesos)
+    if trabalho is None:
+        trabalho = AreaBusca.para_grafo(indptr)
+    t = trabalho
+    custo, encontro = dijkstra_bidirecional_csr(
+        origem, destino, indptr, indices, pesos, *reverso,
+        t.dist_f, t.dist_b, t.prev_f, t.prev_b,
+        t.heap_f, t.heap_b, t.pos_f, t.pos_b,
+    )
+    if encontro == -1:
+        return float("inf"), None
+
+    k = _caminho_bidirecional(t.prev_f, t.prev_b, encontro, t.fila)
+    return float(custo), t.fila[k:].tolist()
+
+
+@njit(cache=True)
+def _caminho_ate(prev, destino, saida):
+    """
+    Escreve em `saida`, do fim para o início, o caminho até `destino` seguindo
+    `prev` (-1 na origem); o caminho fica em `saida[k:]`, já na ordem
+    origem -> destino. Retorna k.
+    """
+    k = saida.size
+    x = destino
+    while x != -1:
+        k -= 1
+        saida[k] = x
+        x = prev[x]
+    return k
+
+
+@njit(cache=True)
+def _caminho_bidirecional(prev_f, prev_b, encontro, saida):
+    """
+    Como `_caminho_ate`, para o encontro das duas frentes: a metade reversa
+    (`prev_b`, do encontro ao destino) ocupa o fim de `saida` e a metade
+    direta é escrita logo antes dela. Retorna k, com o caminho em `saida[k:]`.
+    """
+    # Conta a metade reversa para reservar o fim do buffer
+    fim = saida.size
+    x = prev_b[encontro]
+    while x != -1:
+        fim -= 1
+        x = prev_b[x]
+    i = fim
+    x = prev_b[encontro]
+    while x != -1:
+        saida[i] = x
+        i += 1
+        x = prev_b[x]
+    return _caminho_ate(prev_f, encontro, saida[:fim])
+
+
+def reconstruir_caminho(prev, destino: int, saida=None) -> List[int]:
+    """
+    Caminho de ids da origem até `destino` seguindo `prev` (-1 na origem).
+    `saida` é um buffer int32 com espaço para o caminho (até n posições).
+    """
+    if saida is None:
+        saida = np.empty(prev.size, dtype=np.int32)
+    k = _caminho_ate(prev, destino, saida)
+    return saida[k:].tolist()
+
+
+@njit(cache=True)
+def custo_caminho_csr(caminho, indptr, indices, pesos):
+    """Soma, ao longo de `caminho` (array de ids), o menor peso de cada conexão."""
+    total = 0.0
+    for i in range(caminho.size - 1):
+        u, v = caminho[i], caminho[i + 1]
+        menor = np.inf
+        # A linha CSR tem ~salas + 2 entradas (corredor, portas, escada): varredura linear basta
+        for k in range(indptr[u], indptr[u + 1]):
+            if indices[k] == v and pesos[k] < menor:
+                menor = pesos[k]
+        total += menor
+    return total
+
+
+def custo_caminho(caminho: List[int], indptr, indices, pesos) -> float:
+    """Custo de um caminho de ids, usando a conexão mais barata entre cada par."""
+    ids = np.asarray(caminho, dtype=np.int32)
+    return float(custo_caminho_csr(ids, indptr, indices, pesos))
@@ -11,6 +11,8 @@ from .node import Node
 class Edge:
     """Aresta direcionada com custo (não-negativo) e tipo."""
 
+    __slots__ = ("u", "v", "custo", "tipo")
+
     u: Node
     v: Node
     custo: float
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo com a compilação JIT opcional (Numba) usada pelos laços numéricos
+"""
+
+try:
+    from numba import njit
+
+    NUMBA_DISPONIVEL = True
+except ImportError:
+    NUMBA_DISPONIVEL = False
+
+    def njit(*args, **kwargs):
+        """Sem Numba: devolve a função Python original, sem compilar."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorador(func):
+            return func
+
+        return decorador
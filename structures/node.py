@@ -8,10 +8,21 @@ from dataclasses import dataclass
 
 @dataclass(frozen=True)
 class Node:
-    """Um nó é identificado por (andar, sala)."""
+    """
+    Um nó é identificado por (andar, sala).
+
+    Nas buscas e nos arrays do grafo os nós são ids inteiros
+    (`PredioGrafo.node_id`); `Node` fica para a borda (exibição e API).
+    """
+
+    __slots__ = ("andar", "sala")
 
     andar: int
     sala: int
 
+    def __reduce__(self):
+        # Frozen com __slots__ não tem __dict__: reconstrói pelo construtor
+        return Node, (self.andar, self.sala)
+
     def __str__(self) -> str:
         return f"A{self.andar}:S{self.sala}"
@@ -3,7 +3,9 @@
 Módulo contendo a classe PredioGrafo que gera a estrutura base do prédio
 """
 
-from typing import List
+from functools import cached_property, lru_cache
+from typing import List, Tuple
+import numpy as np
 from .node import Node
 from .edge import Edge
 
@@ -14,11 +16,47 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import CUSTO_LIVRE
 
+# Código (uint8) de cada tipo de aresta em `PredioGrafo.tipo_arr`
+TIPOS_ARESTA = ("porta_par", "porta_impar", "corredor", "escada")
+PORTA_PAR, PORTA_IMPAR, CORREDOR, ESCADA = range(len(TIPOS_ARESTA))
+
+# Sala (1-based) que abriga a escada em todos os andares
+SALA_ESCADA = 6
+
 
 class PredioGrafo:
-    """Gera a estrutura base (sem incerteza aplicada)."""
+    """
+    Gera a estrutura base (sem incerteza aplicada).
+
+    As arestas ficam em três arrays paralelos (`u_arr`, `v_arr`, `tipo_arr`)
+    com os nós codificados como inteiros `(andar - 1) * salas_por_andar +
+    (sala - 1)`; `nodes[i]` é o nó de id `i` e `base_edges` é a mesma
+    sequência em objetos `Edge`. Tudo fica imutável depois de construído.
+    """
 
     def __init__(self, num_andares: int, salas_por_andar: int):
+        self._criar_nodes(num_andares, salas_por_andar)
+        self._construir_arestas_base()
+
+    @classmethod
+    def a_partir_de_arrays(
+        cls, num_andares: int, salas_por_andar: int, u_arr, v_arr, tipo_arr
+    ) -> "PredioGrafo":
+        """Prédio sobre arrays de arestas já montados (ex.: memória compartilhada), sem copiá-los."""
+        predio = cls.__new__(cls)
+        predio._criar_nodes(num_andares, salas_por_andar)
+        predio.u_arr, predio.v_arr, predio.tipo_arr = u_arr, v_arr, tipo_arr
+        predio._validar_arestas()
+        return predio
+
+    def _criar_nodes(self, num_andares: int, salas_por_andar: int):
+        # As escadas ligam os andares pela mesma sala: sem ela, as arestas
+        # apontariam para ids fora do prédio
+        if salas_por_andar < SALA_ESCADA:
+            raise ValueError(
+                f"salas_por_andar deve ser ao menos {SALA_ESCADA} (sala da escada), "
+                f"recebido {salas_por_andar}"
+            )
         self.num_andares = num_andares
         self.salas_por_andar = salas_por_andar
         self.nodes: List[Node] = [
@@ -26,41 +64,112 @@ class PredioGrafo:
             for a in range(1, num_andares + 1)
             for s in range(1, salas_por_andar + 1)
         ]
-        self.base_edges: List[Edge] = []
-        self._construir_arestas_base()
+
+    def node_id(self, node: Node) -> int:
+        """Id inteiro do nó (índice em `nodes`)."""
+        return (node.andar - 1) * self.salas_por_andar + (node.sala - 1)
+
+    def saltos_minimos(self, destino: int) -> np.ndarray:
+        """
+        Limite inferior do número de arestas de cada nó até `destino` (id):
+        no mesmo andar basta o corredor; entre andares é preciso passar pela
+        escada (sala 6). Base da heurística do A*; calculado uma vez por destino.
+        """
+        return _saltos_minimos(self.num_andares, self.salas_por_andar, destino)
+
+    @cached_property
+    def base_edges(self) -> Tuple[Edge, ...]:
+        """Arestas como objetos `Edge`, criadas sob demanda a partir dos arrays."""
+        return tuple(
+            Edge(self.nodes[u], self.nodes[v], CUSTO_LIVRE, TIPOS_ARESTA[t])
+            for u, v, t in zip(
+                self.u_arr.tolist(), self.v_arr.tolist(), self.tipo_arr.tolist()
+            )
+        )
 
     def _construir_arestas_base(self):
-        # 1) Portas entre pares: 2<->4, 4<->6, ..., 10<->12
-        for andar in range(1, self.num_andares + 1):
-            for s in range(2, self.salas_por_andar + 1, 2):
-                if s + 2 <= self.salas_por_andar:
-                    a = Node(andar, s)
-                    b = Node(andar, s + 2)
-                    self._add_bidirectional(a, b, CUSTO_LIVRE, "porta_par")
-
-        # 2) Portas entre ímpares: 1<->3, 3<->5, ..., 9<->11
-        for andar in range(1, self.num_andares + 1):
-            for s in range(1, self.salas_por_andar, 2):
-                if s + 2 <= self.salas_por_andar:
-                    a = Node(andar, s)
-                    b = Node(andar, s + 2)
-                    self._add_bidirectional(a, b, CUSTO_LIVRE, "porta_impar")
-
-        # 3) Corredor comum: conecta quaisquer duas salas do mesmo andar
-        for andar in range(1, self.num_andares + 1):
-            salas = list(range(1, self.salas_por_andar + 1))
-            for i in range(len(salas)):
-                for j in range(i + 1, len(salas)):
-                    a = Node(andar, salas[i])
-                    b = Node(andar, salas[j])
-                    self._add_bidirectional(a, b, CUSTO_LIVRE, "corredor")
+        andares, salas = self.num_andares, self.salas_por_andar
+        # id da sala 1 de cada andar, em coluna para combinar com o modelo do andar
+        inicio_andar = (np.arange(andares, dtype=np.int32) * salas)[:, None]
+        pares_u, pares_v, tipos = [], [], []
+
+        # 1) a 3) Portas e corredor: o mesmo modelo deslocado para cada andar
+        for a, b, tipo in _modelo_andar(salas):
+            pares_u.append((inicio_andar + a).ravel())
+            pares_v.append((inicio_andar + b).ravel())
+            tipos.append(tipo)
 
         # 4) Escadas: sala 6 de cada andar conecta com sala 6 do andar superior
-        for andar in range(1, self.num_andares):
-            a = Node(andar, 6)
-            b = Node(andar + 1, 6)
-            self._add_bidirectional(a, b, CUSTO_LIVRE, "escada")
-
-    def _add_bidirectional(self, a: Node, b: Node, custo: float, tipo: str):
-        self.base_edges.append(Edge(a, b, custo, tipo))
-        self.base_edges.append(Edge(b, a, custo, tipo))
+        escada = inicio_andar[:-1, 0] + (SALA_ESCADA - 1)
+        pares_u.append(escada)
+        pares_v.append(escada + salas)
+        tipos.append(ESCADA)
+
+        u = np.concatenate(pares_u).astype(np.int32)
+        v = np.concatenate(pares_v).astype(np.int32)
+        tipo = np.repeat(
+            np.array(tipos, dtype=np.uint8), [len(p) for p in pares_u]
+        )
+        # Cada par vira a->b seguido de b->a, como nas conexões bidirecionais
+        self.u_arr = np.column_stack((u, v)).ravel()
+        self.v_arr = np.column_stack((v, u)).ravel()
+        self.tipo_arr = np.repeat(tipo, 2)
+        for arr in (self.u_arr, self.v_arr, self.tipo_arr):
+            arr.setflags(write=False)
+        self._validar_arestas()
+
+    def _validar_arestas(self):
+        """
+        Confere, uma vez por prédio, que as arestas só usam ids de `nodes`:
+        os kernels compilados indexam buffers por esses ids sem checar limites.
+        """
+        n = len(self.nodes)
+        if not (self.u_arr.size == self.v_arr.size == self.tipo_arr.size):
+            raise ValueError("u_arr, v_arr e tipo_arr devem ter o mesmo tamanho")
+        if self.u_arr.size and not (
+            0 <= min(self.u_arr.min(), self.v_arr.min())
+            and max(self.u_arr.max(), self.v_arr.max()) < n
+        ):
+            raise ValueError(f"arestas com ids de nó fora de [0, {n})")
+
+
+@lru_cache(maxsize=8)
+def _modelo_andar(salas: int) -> Tuple[Tuple[np.ndarray, np.ndarray, int], ...]:
+    """
+    Conexões de um andar como (salas a, salas b, tipo), com as salas em
+    índice 0-based dentro do andar; iguais em todos os andares, calculadas
+    uma vez por número de salas.
+    """
+    modelo = []
+
+    # 1) Portas entre pares: 2<->4, 4<->6, ..., 10<->12
+    s = np.arange(2, salas - 1, 2)
+    modelo.append((s - 1, s + 1, PORTA_PAR))
+
+    # 2) Portas entre ímpares: 1<->3, 3<->5, ..., 9<->11
+    s = np.arange(1, salas - 1, 2)
+    modelo.append((s - 1, s + 1, PORTA_IMPAR))
+
+    # 3) Corredor comum: conecta quaisquer duas salas do mesmo andar
+    i, j = np.triu_indices(salas, 1)
+    modelo.append((i, j, CORREDOR))
+
+    for a, b, _ in modelo:
+        a.setflags(write=False)
+        b.setflags(write=False)
+    return tuple(modelo)
+
+
+@lru_cache(maxsize=128)
+def _saltos_minimos(num_andares: int, salas: int, destino: int) -> np.ndarray:
+    andar, sala = np.divmod(np.arange(num_andares * salas, dtype=np.int32), salas)
+    andar_destino, sala_destino = divmod(destino, salas)
+    escada = SALA_ESCADA - 1  # índice 0-based
+    distancia_andares = np.abs(andar - andar_destino)
+    saltos = np.where(
+        distancia_andares == 0,
+        sala != sala_destino,
+        distancia_andares + (sala != escada) + (sala_destino != escada),
+    ).astype(np.int32)
+    saltos.setflags(write=False)
+    return saltos
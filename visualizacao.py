@@ -3,44 +3,104 @@
 Módulo de visualização gráfica para o simulador de resgate
 """
 
+import io
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import matplotlib
 matplotlib.use('Agg')  # Backend sem display para salvar arquivos
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.collections import EllipseCollection, LineCollection, PathCollection
+from matplotlib.colors import to_rgba, to_rgba_array
+from matplotlib.font_manager import FontProperties
+from matplotlib.lines import Line2D
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import Affine2D, IdentityTransform
 from matplotlib.animation import FuncAnimation
 import numpy as np
-from typing import List, Dict, Tuple, Optional
+from PIL import Image
+from typing import List, Optional
 from structures.node import Node
-from structures.predio_grafo import PredioGrafo
+from structures.predio_grafo import PredioGrafo, TIPOS_ARESTA, ESCADA, PORTA_PAR, PORTA_IMPAR, SALA_ESCADA
 from structures.amostra_grafo import AmostraGrafo
+from structures.busca import custo_caminho
 from config import NUM_ANDARES, SALAS_POR_ANDAR
 
+# Cores das arestas da amostra (livre, escada congestionada, escada livre,
+# fumaça/porta ímpar, porta par), já com a transparência do desenho
+_CORES_AMOSTRA = to_rgba_array(['green', 'darkorange', 'orange', 'red', 'blue'], alpha=0.7)
+
+# Itens das legendas, criados uma vez e compartilhados entre desenhos (a
+# legenda copia as propriedades para artistas próprios); as salas usam
+# marcadores soltos no lugar de `plt.scatter` vazio, que entraria no eixo atual
+_LEGENDA_BASE = [
+    Line2D([0], [0], color='blue', lw=2, label='Portas Pares'),
+    Line2D([0], [0], color='red', lw=2, label='Portas Ímpares'),
+    Line2D([0], [0], color='orange', lw=3, label='Escadas'),
+    Line2D([0], [0], color='gray', lw=1, linestyle=':', label='Corredores'),
+    Line2D([], [], color='lightblue', marker='o', markersize=10, linestyle='', label='Salas Pares'),
+    Line2D([], [], color='lightcoral', marker='o', markersize=10, linestyle='', label='Salas Ímpares'),
+    Line2D([], [], color='gold', marker='o', markersize=10, linestyle='', label='Escadas (Sala 6)'),
+]
+_LEGENDA_AMOSTRA = [
+    Line2D([0], [0], color='blue', lw=2, label='Portas Pares (Livres)'),
+    Line2D([0], [0], color='red', lw=2, label='Portas Ímpares/Fumaça'),
+    Line2D([0], [0], color='orange', lw=3, label='Escadas (Livre)'),
+    Line2D([0], [0], color='darkorange', lw=3, label='Escadas (Congestionada)'),
+    Line2D([0], [0], color='green', lw=1, label='Corredor (Livre)'),
+    Line2D([0], [0], color='gray', lw=1, label='Bloqueado/Inacessível'),
+]
+
+
 class VisualizadorPredio:
     """Visualiza a estrutura do prédio e simulações de resgate."""
     
     def __init__(self, predio: PredioGrafo, figsize=(14, 10)):
         self.predio = predio
         self.fig, self.ax = plt.subplots(figsize=figsize)
-        self.node_positions = self._calcular_posicoes_nodes()
+        # Margens fixas (as que `tight_layout` calculava para este eixo de
+        # aspecto igual), em vez de refazer o ajuste a cada desenho
+        self.fig.subplots_adjust(left=0.01, right=0.99, bottom=0.06, top=0.96)
+        # Posições (N, 2) indexadas pelo id do nó, como os arrays de arestas
+        self._xy = self._calcular_posicoes_nodes()
+        # Cor de cada sala por id: pares, ímpares e sala 6 (escadas) em destaque
+        salas = np.array([node.sala for node in predio.nodes])
+        self._cores_salas = np.where(
+            salas == SALA_ESCADA, 'gold', np.where(salas % 2 == 0, 'lightblue', 'lightcoral')
+        )
+        self._estilo_arestas_base()
         self.setup_plot()
         
-    def _calcular_posicoes_nodes(self) -> Dict[Node, Tuple[float, float]]:
-        """Calcula posições x,y para cada nó do grafo."""
-        positions = {}
+        # Artistas fixos, atualizados a cada desenho em vez de recriados após
+        # `ax.clear()`: salas (com rótulos) e arestas
+        self._salas = self._desenhar_salas(self.ax, 0.15, self._cores_salas)
+        self._desenhar_rotulos(self.ax, 8, 'bold')
+        self._arestas = LineCollection([], zorder=2)
+        self.ax.add_collection(self._arestas)
+        # Artistas de um só desenho (destaques do caminho), removidos no próximo
+        self._temporarios = []
         
+    def _calcular_posicoes_nodes(self) -> np.ndarray:
+        """Calcula posições x,y de cada nó do grafo, uma linha por id."""
         # Layout: salas lado a lado, andares empilhados
         sala_width = 1.0
         andar_height = 1.5
         
-        for node in self.predio.nodes:
-            x = (node.sala - 1) * sala_width
-            y = (node.andar - 1) * andar_height
-            positions[node] = (x, y)
-            
-        return positions
+        andar, sala = np.divmod(
+            np.arange(len(self.predio.nodes)), self.predio.salas_por_andar
+        )
+        return np.column_stack((sala * sala_width, andar * andar_height))
+    
+    def _posicoes(self, caminho: List[Node]) -> np.ndarray:
+        """Posições (L, 2) dos nós de um caminho."""
+        return self._xy[[self.predio.node_id(node) for node in caminho]]
     
     def setup_plot(self):
-        """Configura o plot básico."""
+        """
+        Configura o plot básico: a parte estática (limites, aspecto, grade e
+        rótulos de andares e salas), aplicada uma vez no `__init__`; cada
+        desenho só troca o título (`_novo_desenho`).
+        """
         self.ax.set_xlim(-0.5, SALAS_POR_ANDAR - 0.5)
         self.ax.set_ylim(-0.5, NUM_ANDARES * 1.5)
         self.ax.set_aspect('equal')
@@ -61,28 +121,47 @@ class VisualizadorPredio:
             self.ax.text(sala - 1, -1, f'S{sala}', 
                         ha='center', va='center', fontweight='bold')
     
+    def _desenhar_salas(self, ax, raio: float, cores, bordas='black', linewidth=1) -> EllipseCollection:
+        """Todas as salas como uma única coleção de círculos (raio em unidades de dados)."""
+        return ax.add_collection(EllipseCollection(
+            2 * raio, 2 * raio, 0, units='xy', offsets=self._xy,
+            offset_transform=ax.transData, facecolors=cores,
+            edgecolors=bordas, linewidths=linewidth,
+        ))
+
+    def _novo_desenho(self, titulo: str):
+        """Descarta os artistas do desenho anterior que não são fixos e troca o título."""
+        for artista in self._temporarios:
+            artista.remove()
+        self._temporarios.clear()
+        self.ax.set_title(titulo, fontsize=16, fontweight='bold')
+
+    def _desenhar_rotulos(self, ax, tamanho: float, peso: str = 'normal') -> PathCollection:
+        """
+        Número de cada sala como uma única coleção de contornos de texto,
+        centrados nas salas, no lugar de um `Text` por nó.
+        """
+        glifos = {}
+        for sala in range(1, self.predio.salas_por_andar + 1):
+            # Contorno com 1 unidade = 1 ponto de fonte, centrado na origem
+            contorno = TextPath((0, 0), str(sala), size=1, prop=FontProperties(weight=peso))
+            glifos[sala] = contorno.transformed(
+                Affine2D().translate(*-contorno.get_extents().get_points().mean(axis=0)))
+        # `sizes` (em pontos²) escala o contorno para `tamanho` pontos, como os marcadores
+        return ax.add_collection(PathCollection(
+            [glifos[node.sala] for node in self.predio.nodes], sizes=[tamanho ** 2],
+            offsets=self._xy, offset_transform=ax.transData, transform=IdentityTransform(),
+            facecolors='black', edgecolors='none', zorder=3,
+        ))
+
     def desenhar_estrutura_base(self):
         """Desenha a estrutura base do prédio."""
-        self.ax.clear()
-        self.setup_plot()
+        self._novo_desenho('Simulador de Resgate - Estrutura do Prédio')
         
-        # Desenhar nós (salas)
-        for node in self.predio.nodes:
-            x, y = self.node_positions[node]
-            
-            # Cor diferente para salas pares e ímpares
-            color = 'lightblue' if node.sala % 2 == 0 else 'lightcoral'
-            
-            # Destacar sala 6 (escadas)
-            if node.sala == 6:
-                color = 'gold'
-                
-            circle = plt.Circle((x, y), 0.15, color=color, ec='black', linewidth=2)
-            self.ax.add_patch(circle)
-            
-            # Label do nó
-            self.ax.text(x, y, f'{node.sala}', ha='center', va='center', 
-                        fontweight='bold', fontsize=8)
+        # Nós (salas)
+        self._salas.set_facecolor(self._cores_salas)
+        self._salas.set_edgecolor('black')
+        self._salas.set_linewidth(2)
         
         # Desenhar arestas
         self._desenhar_arestas_base()
@@ -90,77 +169,59 @@ class VisualizadorPredio:
         # Legenda
         self._adicionar_legenda_base()
         
-        plt.tight_layout()
         return self.fig
     
+    def _segmentos(self, u, v) -> np.ndarray:
+        """Segmentos (E, 2, 2) das arestas u->v (arrays de ids)."""
+        return np.stack((self._xy[u], self._xy[v]), axis=1)
+
+    # Estilo das arestas da base por tipo: (cor, linha, largura, alpha)
+    _ESTILO_BASE = {
+        'porta_par': ('blue', '-', 1, 0.7),
+        'porta_impar': ('red', '-', 1, 0.7),
+        'escada': ('orange', '-', 3, 1.0),
+        'corredor': ('gray', ':', 1, 0.3),
+    }
+
+    def _estilo_arestas_base(self):
+        """Segmentos, cores, estilos e larguras das arestas da base, que só dependem do tipo."""
+        predio = self.predio
+        estilos = [self._ESTILO_BASE[TIPOS_ARESTA[t]] for t in predio.tipo_arr.tolist()]
+        self._segmentos_base = self._segmentos(predio.u_arr, predio.v_arr)
+        self._cores_base = [to_rgba(cor, alpha) for cor, _, _, alpha in estilos]
+        self._linhas_base = [linha for _, linha, _, _ in estilos]
+        self._larguras_base = [largura for _, _, largura, _ in estilos]
+
     def _desenhar_arestas_base(self):
         """Desenha as arestas da estrutura base."""
-        for edge in self.predio.base_edges:
-            x1, y1 = self.node_positions[edge.u]
-            x2, y2 = self.node_positions[edge.v]
-            
-            # Cores e estilos por tipo de aresta
-            if edge.tipo == 'porta_par':
-                color, linestyle, alpha = 'blue', '-', 0.7
-            elif edge.tipo == 'porta_impar':
-                color, linestyle, alpha = 'red', '-', 0.7
-            elif edge.tipo == 'escada':
-                color, linestyle, alpha = 'orange', '-', 1.0
-                linewidth = 3
-            else:  # corredor
-                color, linestyle, alpha = 'gray', ':', 0.3
-                
-            linewidth = 3 if edge.tipo == 'escada' else 1
-            
-            self.ax.plot([x1, x2], [y1, y2], color=color, linestyle=linestyle, 
-                        alpha=alpha, linewidth=linewidth)
+        # Uma única coleção para todas as arestas, acima das salas como as linhas
+        self._arestas.set_segments(self._segmentos_base)
+        self._arestas.set_color(self._cores_base)
+        self._arestas.set_linestyle(self._linhas_base)
+        self._arestas.set_linewidth(self._larguras_base)
     
     def _adicionar_legenda_base(self):
         """Adiciona legenda para a estrutura base."""
-        legend_elements = [
-            plt.Line2D([0], [0], color='blue', lw=2, label='Portas Pares'),
-            plt.Line2D([0], [0], color='red', lw=2, label='Portas Ímpares'),
-            plt.Line2D([0], [0], color='orange', lw=3, label='Escadas'),
-            plt.Line2D([0], [0], color='gray', lw=1, linestyle=':', label='Corredores'),
-            plt.scatter([], [], c='lightblue', s=100, label='Salas Pares'),
-            plt.scatter([], [], c='lightcoral', s=100, label='Salas Ímpares'),
-            plt.scatter([], [], c='gold', s=100, label='Escadas (Sala 6)')
-        ]
-        self.ax.legend(handles=legend_elements, loc='upper right', bbox_to_anchor=(1.15, 1))
+        self.ax.legend(handles=_LEGENDA_BASE, loc='upper right', bbox_to_anchor=(1.15, 1))
     
     def visualizar_amostra(self, amostra: AmostraGrafo, seed: Optional[int] = None):
         """Visualiza uma amostra com incertezas aplicadas."""
-        self.ax.clear()
-        self.setup_plot()
-        
         # Título com informação da semente
         title = 'Simulador de Resgate - Amostra com Incertezas'
         if seed is not None:
             title += f' (Semente: {seed})'
-        self.ax.set_title(title, fontsize=16, fontweight='bold')
+        self._novo_desenho(title)
         
-        # Desenhar nós
-        for node in self.predio.nodes:
-            x, y = self.node_positions[node]
-            
-            # Verificar se o nó tem conexões na amostra
-            has_connections = node in amostra.adj and len(amostra.adj[node]) > 0
-            
-            if has_connections:
-                color = 'lightblue' if node.sala % 2 == 0 else 'lightcoral'
-                if node.sala == 6:
-                    color = 'gold'
-                alpha = 1.0
-            else:
-                color = 'gray'
-                alpha = 0.3
-                
-            circle = plt.Circle((x, y), 0.15, color=color, alpha=alpha, 
-                              ec='black', linewidth=1)
-            self.ax.add_patch(circle)
-            
-            self.ax.text(x, y, f'{node.sala}', ha='center', va='center', 
-                        fontweight='bold', fontsize=8)
+        # Nós com alguma conexão na amostra (faixa não vazia no CSR)
+        conectado = np.diff(amostra.indptr) > 0
+        
+        # Desenhar nós: sem conexões na amostra ficam cinza e translúcidos
+        cores = to_rgba_array(np.where(conectado, self._cores_salas, 'gray'))
+        bordas = to_rgba_array(['black'] * len(cores))
+        cores[:, 3] = bordas[:, 3] = np.where(conectado, 1.0, 0.3)
+        self._salas.set_facecolor(cores)
+        self._salas.set_edgecolor(bordas)
+        self._salas.set_linewidth(1)
         
         # Desenhar arestas da amostra
         self._desenhar_arestas_amostra(amostra)
@@ -168,55 +229,28 @@ class VisualizadorPredio:
         # Legenda para amostra
         self._adicionar_legenda_amostra()
         
-        plt.tight_layout()
         return self.fig
     
     def _desenhar_arestas_amostra(self, amostra: AmostraGrafo):
         """Desenha as arestas da amostra com incertezas."""
-        # Mapear arestas da amostra para tipos originais
-        edge_map = {}
-        for edge in self.predio.base_edges:
-            key = (edge.u, edge.v)
-            edge_map[key] = edge.tipo
+        tipos, custos = amostra.tipos, amostra.pesos
+        escada, fumaca = tipos == ESCADA, custos >= 5.0
+        # Cor baseada no custo e tipo, como índice em `_CORES_AMOSTRA`
+        cores = np.select(
+            [escada & (custos > 1.0), escada, fumaca, tipos == PORTA_PAR, tipos == PORTA_IMPAR],
+            [1, 2, 3, 4, 3],
+            default=0,
+        )
+        larguras = np.where(escada, 3, np.where(fumaca, 2, 1))
         
-        for u, vizinhos in amostra.adj.items():
-            for v, custo in vizinhos:
-                x1, y1 = self.node_positions[u]
-                x2, y2 = self.node_positions[v]
-                
-                # Determinar tipo da aresta original
-                edge_type = edge_map.get((u, v), 'corredor')
-                
-                # Cor baseada no custo e tipo
-                if edge_type == 'escada':
-                    color = 'darkorange' if custo > 1.0 else 'orange'
-                    linewidth = 3
-                elif custo >= 5.0:  # Fumaça
-                    color = 'red'
-                    linewidth = 2
-                elif edge_type == 'porta_par':
-                    color = 'blue'
-                    linewidth = 1
-                elif edge_type == 'porta_impar':
-                    color = 'red'
-                    linewidth = 1
-                else:  # corredor normal
-                    color = 'green'
-                    linewidth = 1
-                
-                self.ax.plot([x1, x2], [y1, y2], color=color, linewidth=linewidth, alpha=0.7)
+        self._arestas.set_segments(self._segmentos(amostra.origens, amostra.indices))
+        self._arestas.set_color(_CORES_AMOSTRA[cores])
+        self._arestas.set_linestyle('-')
+        self._arestas.set_linewidth(larguras)
     
     def _adicionar_legenda_amostra(self):
         """Adiciona legenda para a amostra."""
-        legend_elements = [
-            plt.Line2D([0], [0], color='blue', lw=2, label='Portas Pares (Livres)'),
-            plt.Line2D([0], [0], color='red', lw=2, label='Portas Ímpares/Fumaça'),
-            plt.Line2D([0], [0], color='orange', lw=3, label='Escadas (Livre)'),
-            plt.Line2D([0], [0], color='darkorange', lw=3, label='Escadas (Congestionada)'),
-            plt.Line2D([0], [0], color='green', lw=1, label='Corredor (Livre)'),
-            plt.Line2D([0], [0], color='gray', lw=1, label='Bloqueado/Inacessível')
-        ]
-        self.ax.legend(handles=legend_elements, loc='upper right', bbox_to_anchor=(1.15, 1))
+        self.ax.legend(handles=_LEGENDA_AMOSTRA, loc='upper right', bbox_to_anchor=(1.15, 1))
     
     def visualizar_caminho(self, amostra: AmostraGrafo, caminho: List[Node], 
                           titulo: str = "Caminho Encontrado", seed: Optional[int] = None):
@@ -226,16 +260,17 @@ class VisualizadorPredio:
         
         # Atualizar título
         self.ax.set_title(titulo, fontsize=16, fontweight='bold')
+        temporarios = self._temporarios
         
         if not caminho:
-            self.ax.text(SALAS_POR_ANDAR/2, NUM_ANDARES*1.5/2, 'CAMINHO NÃO ENCONTRADO', 
+            temporarios.append(self.ax.text(SALAS_POR_ANDAR/2, NUM_ANDARES*1.5/2, 'CAMINHO NÃO ENCONTRADO', 
                         ha='center', va='center', fontsize=20, color='red', 
-                        bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow", alpha=0.8))
+                        bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow", alpha=0.8)))
             return self.fig
         
         # Destacar nós do caminho
-        for i, node in enumerate(caminho):
-            x, y = self.node_positions[node]
+        pontos = self._posicoes(caminho).tolist()
+        for i, (x, y) in enumerate(pontos):
             
             if i == 0:  # Origem
                 color, label = 'lime', 'INÍCIO'
@@ -247,35 +282,36 @@ class VisualizadorPredio:
                 color, label = 'yellow', ''
                 circle = plt.Circle((x, y), 0.18, color=color, ec='orange', linewidth=2)
             
-            self.ax.add_patch(circle)
+            temporarios.append(self.ax.add_patch(circle))
             
             if label:
-                self.ax.text(x, y-0.4, label, ha='center', va='center', 
-                           fontweight='bold', fontsize=8)
+                temporarios.append(self.ax.text(x, y-0.4, label, ha='center', va='center', 
+                           fontweight='bold', fontsize=8))
         
-        # Desenhar caminho
-        for i in range(len(caminho) - 1):
-            x1, y1 = self.node_positions[caminho[i]]
-            x2, y2 = self.node_positions[caminho[i + 1]]
-            
-            self.ax.plot([x1, x2], [y1, y2], color='purple', linewidth=4, 
-                        alpha=0.8, zorder=10)
-            
-            # Seta indicando direção
-            dx, dy = x2 - x1, y2 - y1
-            if abs(dx) > 0.1 or abs(dy) > 0.1:  # Só desenha seta se não for muito pequena
-                self.ax.annotate('', xy=(x2, y2), xytext=(x1, y1),
-                               arrowprops=dict(arrowstyle='->', color='purple', 
-                                             lw=2, alpha=0.8), zorder=10)
+        # Desenhar caminho: uma coleção para os trechos e um único quiver para
+        # as setas de direção
+        xy = np.asarray(pontos)
+        temporarios.append(self.ax.add_collection(LineCollection(
+            np.stack([xy[:-1], xy[1:]], axis=1), colors='purple', linewidths=4,
+            alpha=0.8, zorder=10,
+        )))
+        origem, delta = xy[:-1], np.diff(xy, axis=0)
+        # Só desenha seta se não for muito pequena
+        visivel = (np.abs(delta) > 0.1).any(axis=1)
+        if visivel.any():
+            temporarios.append(self.ax.quiver(
+                origem[visivel, 0], origem[visivel, 1], delta[visivel, 0], delta[visivel, 1],
+                angles='xy', scale_units='xy', scale=1, color='purple', alpha=0.8,
+                width=0.003, zorder=10,
+            ))
         
         # Informações do caminho
         custo_total = self._calcular_custo_caminho(amostra, caminho)
         info_text = f'Passos: {len(caminho)-1}\nCusto Total: {custo_total:.1f}'
-        self.ax.text(0.02, 0.98, info_text, transform=self.ax.transAxes, 
+        temporarios.append(self.ax.text(0.02, 0.98, info_text, transform=self.ax.transAxes, 
                     va='top', ha='left', fontsize=10,
-                    bbox=dict(boxstyle="round,pad=0.3", facecolor="lightblue", alpha=0.8))
+                    bbox=dict(boxstyle="round,pad=0.3", facecolor="lightblue", alpha=0.8)))
         
-        plt.tight_layout()
         return self.fig
     
     def _calcular_custo_caminho(self, amostra: AmostraGrafo, caminho: List[Node]) -> float:
@@ -283,27 +319,15 @@ class VisualizadorPredio:
         if len(caminho) <= 1:
             return 0.0
         
-        custo_total = 0.0
-        for i in range(len(caminho) - 1):
-            u, v = caminho[i], caminho[i + 1]
-            
-            # Buscar custo na adjacência
-            if u in amostra.adj:
-                for vizinho, custo in amostra.adj[u]:
-                    if vizinho == v:
-                        custo_total += custo
-                        break
-                else:
-                    return float('inf')  # Caminho inválido
-            else:
-                return float('inf')  # Nó sem saída
-        
-        return custo_total
+        # Conexão ausente no CSR soma infinito: caminho inválido
+        ids = [self.predio.node_id(node) for node in caminho]
+        return custo_caminho(ids, *amostra.csr)
     
     def comparar_algoritmos(self, amostra: AmostraGrafo, caminho_bfs: List[Node], 
                            caminho_dijkstra: List[Node], seed: Optional[int] = None):
         """Compara visualmente os resultados de BFS e Dijkstra."""
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(20, 8))
+        fig.subplots_adjust(left=0.01, right=0.99, bottom=0.05, top=0.95, wspace=0.01)
         
         # Configurar ambos os subplots
         for ax in [ax1, ax2]:
@@ -320,39 +344,31 @@ class VisualizadorPredio:
         ax2.set_title('Dijkstra (Menor Custo)', fontsize=14, fontweight='bold')
         self._desenhar_comparacao(ax2, amostra, caminho_dijkstra, 'red')
         
-        plt.tight_layout()
         return fig
     
     def _desenhar_comparacao(self, ax, amostra: AmostraGrafo, caminho: List[Node], cor_caminho: str):
         """Desenha um subplot para comparação de algoritmos."""
         # Desenhar nós
-        for node in self.predio.nodes:
-            x, y = self.node_positions[node]
-            color = 'lightblue' if node.sala % 2 == 0 else 'lightcoral'
-            if node.sala == 6:
-                color = 'gold'
-                
-            circle = plt.Circle((x, y), 0.12, color=color, ec='black', linewidth=1)
-            ax.add_patch(circle)
-            ax.text(x, y, f'{node.sala}', ha='center', va='center', fontsize=6)
+        self._desenhar_salas(ax, 0.12, self._cores_salas)
+        self._desenhar_rotulos(ax, 6)
         
         # Desenhar arestas da amostra (simplificado)
-        for u, vizinhos in amostra.adj.items():
-            for v, custo in vizinhos:
-                x1, y1 = self.node_positions[u]
-                x2, y2 = self.node_positions[v]
-                ax.plot([x1, x2], [y1, y2], color='gray', linewidth=0.5, alpha=0.3)
+        ax.add_collection(LineCollection(
+            self._segmentos(amostra.origens, amostra.indices), colors='gray',
+            linewidths=0.5, alpha=0.3, zorder=2,
+        ))
         
         # Desenhar caminho
         if caminho:
-            for i in range(len(caminho) - 1):
-                x1, y1 = self.node_positions[caminho[i]]
-                x2, y2 = self.node_positions[caminho[i + 1]]
-                ax.plot([x1, x2], [y1, y2], color=cor_caminho, linewidth=3, alpha=0.8)
+            xy = self._posicoes(caminho)
+            ax.add_collection(LineCollection(
+                np.stack([xy[:-1], xy[1:]], axis=1), colors=cor_caminho,
+                linewidths=3, alpha=0.8, zorder=2,
+            ))
             
             # Marcar início e fim
-            x_inicio, y_inicio = self.node_positions[caminho[0]]
-            x_fim, y_fim = self.node_positions[caminho[-1]]
+            x_inicio, y_inicio = xy[0]
+            x_fim, y_fim = xy[-1]
             
             ax.scatter(x_inicio, y_inicio, c='green', s=200, marker='o', 
                       edgecolors='darkgreen', linewidth=2, zorder=10)
@@ -368,6 +384,37 @@ class VisualizadorPredio:
             ax.text(SALAS_POR_ANDAR/2, NUM_ANDARES*1.5/2, 'SEM CAMINHO', 
                    ha='center', va='center', fontsize=16, color='red')
 
+# Codificação dos PNGs fora da thread de desenho (o zlib do Pillow libera o GIL)
+_pool_salvamento = ThreadPoolExecutor(max_workers=1)
+
+
+def _gravar_png(nome_arquivo: str, raster: io.BytesIO, dpi: int):
+    """Codifica e grava a imagem rasterizada (executado na thread de salvamento)."""
+    # Codifica em memória e grava o arquivo numa única escrita, em vez dos
+    # vários blocos IDAT pequenos escritos direto no arquivo
+    png = io.BytesIO()
+    Image.open(raster).save(png, format='png', dpi=(dpi, dpi),
+                            optimize=False, compress_level=1)
+    with open(nome_arquivo, 'wb') as arquivo:
+        arquivo.write(png.getbuffer())
+
+
+def salvar_figura(fig, nome_arquivo: str, dpi: int = 300) -> Future:
+    """
+    Salva a figura em PNG (recorte 'tight'). Só a rasterização ocorre aqui;
+    a codificação, com compressão zlib mínima, e a escrita seguem em segundo
+    plano, enquanto a próxima figura é desenhada (o matplotlib não pode ser
+    usado fora desta thread, mas os pixels copiados podem). Devolve o
+    `Future` da gravação: chame `.result()` antes de depender do arquivo.
+    """
+    # TIFF sem compressão: custa o mesmo que os bytes RGBA crus, mas leva as
+    # dimensões do recorte no próprio cabeçalho
+    raster = io.BytesIO()
+    fig.savefig(raster, format='tiff', dpi=dpi, bbox_inches='tight')
+    raster.seek(0)
+    return _pool_salvamento.submit(_gravar_png, nome_arquivo, raster, dpi)
+
+
 def demonstracao_visualizacao():
     """Função de demonstração da visualização."""
     from structures.predio_grafo import PredioGrafo
@@ -384,16 +431,20 @@ def demonstracao_visualizacao():
     # 1. Estrutura base
     print("Gerando visualização da estrutura base...")
     fig1 = vis.desenhar_estrutura_base()
-    fig1.savefig('estrutura_base.png', dpi=300, bbox_inches='tight')
-    print("✅ Salvo: estrutura_base.png")
+    gravacao1 = salvar_figura(fig1, 'estrutura_base.png')
     
-    # 2. Amostra com incertezas
+    # 2. Amostra com incertezas (desenhada enquanto a primeira é gravada)
     print("Gerando visualização da amostra...")
     fig2 = vis.visualizar_amostra(amostra, SEMENTE)
-    fig2.savefig('amostra_incertezas.png', dpi=300, bbox_inches='tight')
-    print("✅ Salvo: amostra_incertezas.png")
+    gravacao2 = salvar_figura(fig2, 'amostra_incertezas.png')
+    # Os pixels já foram copiados: fecha a figura (a mesma nas duas vistas)
+    # sem esperar a gravação terminar
+    plt.close(fig2)
     
-    plt.close('all')  # Fechar figuras para liberar memória
+    gravacao1.result()
+    print("✅ Salvo: estrutura_base.png")
+    gravacao2.result()
+    print("✅ Salvo: amostra_incertezas.png")
     print("🎨 Visualizações geradas com sucesso!")
 
 if __name__ == "__main__":